@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+import boto3
+
+from lambda_function import PROCESSED_PREFIX, PROCESSING_VERSION, is_current, process_object
+
+# Per-process state for the pool workers
+_s3 = None
+_bucket = None
+
+
+def _init_worker(bucket: str):
+    global _s3, _bucket
+    _s3 = boto3.client('s3')
+    _bucket = bucket
+
+
+def _process_key(key: str, size: int, force: bool) -> Tuple[str, str, int, Optional[str]]:
+    """Run the Lambda processing core for one object inside a worker"""
+    try:
+        if not force and is_current(_s3, _bucket, key):
+            return key, 'skipped', size, None
+        metadata = process_object(_s3, _bucket, key)
+        # The metadata is written without a version marker, but the
+        # checkpoint must not count the key as done either
+        if 'transcode_error' in metadata:
+            return key, 'failed', size, metadata['transcode_error']
+        return key, 'processed', size, None
+    except Exception as e:
+        return key, 'failed', size, str(e)
+
+
+def list_objects(s3, bucket: str, prefix: str) -> Iterator[Tuple[str, int]]:
+    """Yield (key, size) for every object under ``prefix``"""
+    paginator = s3.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            if not obj['Key'].startswith(PROCESSED_PREFIX):
+                yield obj['Key'], obj['Size']
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines log of finished keys
+
+    A resumed run skips keys already processed or skipped by the same
+    PROCESSING_VERSION; failed keys are retried. Entries also record
+    whether the run was forced, and a forced run only resumes from entries
+    of forced runs, so ``--force`` after a normal run reprocesses
+    everything.
+    """
+
+    def __init__(self, path: str, force: bool = False):
+        self.path = path
+        self.force = force
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Partial last line from an interrupted run
+                        continue
+                    if (
+                        entry['version'] == PROCESSING_VERSION
+                        and entry['status'] != 'failed'
+                        and (entry.get('force', False) or not force)
+                    ):
+                        self.done.add(entry['key'])
+        self._file = open(path, 'a')
+
+    def record(self, key: str, status: str, error: Optional[str] = None):
+        entry = {'key': key, 'status': status, 'version': PROCESSING_VERSION, 'force': self.force}
+        if error:
+            entry['error'] = error
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def backfill(
+    bucket: str,
+    prefix: str = 'oak_videos/',
+    workers: Optional[int] = None,
+    checkpoint_path: str = 'backfill_checkpoint.jsonl',
+    force: bool = False,
+    report_every: float = 10.0
+) -> Dict:
+    """
+    Reprocess every object under a prefix with the Lambda processing core
+
+    Args:
+        bucket: Bucket to backfill
+        prefix: Key prefix to enumerate
+        workers: Worker processes (defaults to CPU count)
+        checkpoint_path: Progress log used to resume an interrupted run
+        force: Reprocess objects whose metadata is already current,
+            including ones finished by earlier unforced runs
+        report_every: Seconds between progress reports
+
+    Returns:
+        dict: Counts and throughput of the run
+    """
+    workers = workers or os.cpu_count()
+    # Bound the queue so listing millions of keys does not buffer them all
+    max_in_flight = workers * 4
+    checkpoint = Checkpoint(checkpoint_path, force)
+    counts = {'processed': 0, 'skipped': 0, 'failed': 0, 'resumed': 0}
+    total_bytes = 0
+    start = last_report = time.time()
+
+    def report(final: bool = False) -> Dict:
+        elapsed = max(time.time() - start, 1e-9)
+        finished = counts['processed'] + counts['skipped'] + counts['failed']
+        stats = dict(
+            counts,
+            seconds=round(elapsed, 1),
+            objects_per_sec=round(finished / elapsed, 2),
+            mb_per_sec=round(total_bytes / elapsed / 1e6, 2)
+        )
+        print(('Backfill complete: ' if final else 'Progress: ') + json.dumps(stats))
+        return stats
+
+    def collect(futures):
+        nonlocal total_bytes
+        for future in futures:
+            key, status, size, error = future.result()
+            counts[status] += 1
+            if status == 'processed':
+                total_bytes += size
+            if error:
+                print(f"Failed {key}: {error}")
+            checkpoint.record(key, status, error)
+
+    s3 = boto3.client('s3')
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(bucket,)
+        ) as executor:
+            in_flight = set()
+            for key, size in list_objects(s3, bucket, prefix):
+                if key in checkpoint.done:
+                    counts['resumed'] += 1
+                    continue
+                if len(in_flight) >= max_in_flight:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                in_flight.add(executor.submit(_process_key, key, size, force))
+
+                if time.time() - last_report >= report_every:
+                    report()
+                    last_report = time.time()
+
+            while in_flight:
+                finished, in_flight = wait(in_flight, timeout=report_every, return_when=FIRST_COMPLETED)
+                collect(finished)
+                if time.time() - last_report >= report_every:
+                    report()
+                    last_report = time.time()
+    finally:
+        checkpoint.close()
+
+    return report(final=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reprocess existing uploads with the Lambda processing logic')
+    parser.add_argument('--bucket', default=os.getenv('S3_BUCKET_NAME', 'spokhand-data'))
+    parser.add_argument('--prefix', default='oak_videos/')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--checkpoint', default='backfill_checkpoint.jsonl', help='Progress log for resuming')
+    parser.add_argument('--force', action='store_true', help='Reprocess objects that are already current')
+    args = parser.parse_args()
+
+    backfill(args.bucket, args.prefix, args.workers, args.checkpoint, args.force)
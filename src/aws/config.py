@@ -1,6 +1,6 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
-import boto3
 
 # Load environment variables
 load_dotenv()
@@ -10,20 +10,39 @@ class AWSConfig:
         self.aws_access_key_id = os.getenv('AWS_ACCESS_KEY_ID')
         self.aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY')
         self.region_name = os.getenv('AWS_REGION', 'us-east-1')
-        
-        # Initialize AWS clients
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=self.aws_access_key_id,
-            aws_secret_access_key=self.aws_secret_access_key,
-            region_name=self.region_name
-        )
-        
+
+        # AWS clients are created on first use; importing boto3 and building
+        # a client costs hundreds of milliseconds at start-up
+        self._s3_client = None
+
         # S3 bucket configuration
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'spokhand-data')
-        
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            import boto3
+            self._s3_client = boto3.client(
+                's3',
+                aws_access_key_id=self.aws_access_key_id,
+                aws_secret_access_key=self.aws_secret_access_key,
+                region_name=self.region_name
+            )
+        return self._s3_client
+
     def get_s3_client(self):
         return self.s3_client
-    
+
     def get_bucket_name(self):
-        return self.bucket_name 
\ No newline at end of file
+        return self.bucket_name
+
+@lru_cache(maxsize=None)
+def get_aws_config() -> AWSConfig:
+    """
+    Return the process-wide AWSConfig
+
+    The instance (and the S3 client it creates lazily) is shared by every
+    caller and survives Streamlit reruns, since modules stay imported.
+    boto3 clients are thread-safe.
+    """
+    return AWSConfig()
@@ -1,33 +1,108 @@
 import boto3
+import hashlib
 import os
 import zipfile
-import shutil
 from botocore.exceptions import ClientError
 
+# Files shipped in the Lambda package and the dependency spec bundled with them
+LAMBDA_SOURCES = ['lambda_function.py', 'video_pipeline.py']
+LAMBDA_REQUIREMENTS = 'boto3==1.34.0\n'
+
+# Built packages are cached here, keyed by their content hash
+PACKAGE_CACHE_DIR = '.lambda_cache'
+PACKAGE_CACHE_KEEP = 5
+
+# Fixed timestamp for every zip entry so identical inputs give identical bytes
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+def lambda_package_files():
+    """Return the package contents as {archive name: bytes}"""
+    files = {}
+    for source in LAMBDA_SOURCES:
+        with open(source, 'rb') as f:
+            files[source] = f.read()
+    files['requirements.txt'] = LAMBDA_REQUIREMENTS.encode()
+    return files
+
+def package_hash(files):
+    """Content hash of the package sources and dependencies"""
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(name.encode() + b'\0')
+        digest.update(hashlib.sha256(files[name]).digest())
+    return digest.hexdigest()
+
 def create_lambda_package():
-    """Create a zip package for the Lambda function"""
-    # Create a temporary directory
-    if os.path.exists('lambda_package'):
-        shutil.rmtree('lambda_package')
-    os.makedirs('lambda_package')
-    
-    # Copy the Lambda function
-    shutil.copy('lambda_function.py', 'lambda_package/')
-    
-    # Create requirements.txt for Lambda
-    with open('lambda_package/requirements.txt', 'w') as f:
-        f.write('boto3==1.34.0\n')
-    
+    """
+    Create a reproducible zip package for the Lambda function
+
+    The zip has sorted entries with fixed timestamps and permissions, and is
+    cached under PACKAGE_CACHE_DIR by content hash, so unchanged sources are
+    never re-zipped.
+
+    Returns:
+        tuple: (path to the zip file, content hash)
+    """
+    files = lambda_package_files()
+    digest = package_hash(files)
+    os.makedirs(PACKAGE_CACHE_DIR, exist_ok=True)
+    zip_path = os.path.join(PACKAGE_CACHE_DIR, f'lambda_function-{digest[:16]}.zip')
+
+    if os.path.exists(zip_path):
+        print(f"Using cached Lambda package {zip_path}")
+        os.utime(zip_path)
+        return zip_path, digest
+
     # Create the zip file
-    with zipfile.ZipFile('lambda_function.zip', 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk('lambda_package'):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, 'lambda_package')
-                zipf.write(file_path, arcname)
-    
-    # Clean up
-    shutil.rmtree('lambda_package')
+    tmp_path = zip_path + '.tmp'
+    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for name in sorted(files):
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            zipf.writestr(info, files[name])
+    os.replace(tmp_path, zip_path)
+    print(f"Built Lambda package {zip_path}")
+
+    # Keep only the most recently used packages
+    cached = sorted(
+        (os.path.join(PACKAGE_CACHE_DIR, name) for name in os.listdir(PACKAGE_CACHE_DIR) if name.endswith('.zip')),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for old_path in cached[PACKAGE_CACHE_KEEP:]:
+        os.remove(old_path)
+
+    return zip_path, digest
+
+def upload_lambda_package(s3_client, bucket_name, zip_path, digest):
+    """
+    Upload the Lambda package unless S3 already holds the same content
+
+    The package is stored under a content-addressed key so CloudFormation
+    sees a new S3Key, and redeploys the function, only when the code changed.
+
+    Returns:
+        str: S3 key of the package
+    """
+    s3_key = f'lambda/lambda_function-{digest[:16]}.zip'
+    try:
+        response = s3_client.head_object(Bucket=bucket_name, Key=s3_key)
+        if response.get('Metadata', {}).get('content-sha256') == digest:
+            print(f"Lambda package unchanged, skipping upload of s3://{bucket_name}/{s3_key}")
+            return s3_key
+    except ClientError as e:
+        if e.response['Error']['Code'] not in ('404', 'NoSuchKey', 'NotFound'):
+            raise
+
+    print("Uploading Lambda package to S3...")
+    s3_client.upload_file(
+        zip_path,
+        bucket_name,
+        s3_key,
+        ExtraArgs={'Metadata': {'content-sha256': digest}}
+    )
+    return s3_key
 
 def create_s3_bucket(s3_client, bucket_name):
     """Create S3 bucket if it doesn't exist"""
@@ -53,17 +128,17 @@ def deploy_infrastructure():
     bucket_name = 'spokhand-data'
     create_s3_bucket(s3_client, bucket_name)
     
-    # Create the Lambda package
-    create_lambda_package()
+    # Create the Lambda package (cached when the sources are unchanged)
+    zip_path, digest = create_lambda_package()
     
     try:
-        # Upload Lambda package to S3
-        print("Uploading Lambda package to S3...")
-        s3_client.upload_file(
-            'lambda_function.zip',
-            bucket_name,
-            'lambda/lambda_function.zip'
-        )
+        # Upload Lambda package to S3 unless it is already there
+        code_key = upload_lambda_package(s3_client, bucket_name, zip_path, digest)
+        parameters = [
+            {'ParameterKey': 'LambdaCodeKey', 'ParameterValue': code_key},
+            # Transcoding needs an ffmpeg layer; without one it stays off
+            {'ParameterKey': 'FfmpegLayerArn', 'ParameterValue': os.getenv('FFMPEG_LAYER_ARN', '')}
+        ]
         
         # Deploy CloudFormation stack
         print("Deploying CloudFormation stack...")
@@ -73,6 +148,7 @@ def deploy_infrastructure():
             response = cf_client.create_stack(
                 StackName='spokhand-stack',
                 TemplateBody=template_body,
+                Parameters=parameters,
                 Capabilities=['CAPABILITY_IAM']
             )
             print(f"Stack creation initiated: {response['StackId']}")
@@ -83,16 +159,23 @@ def deploy_infrastructure():
         except ClientError as e:
             if 'AlreadyExistsException' in str(e):
                 print("Stack already exists. Attempting to update stack...")
-                response = cf_client.update_stack(
-                    StackName='spokhand-stack',
-                    TemplateBody=template_body,
-                    Capabilities=['CAPABILITY_IAM']
-                )
-                print(f"Stack update initiated: {response['StackId']}")
-                print("Waiting for stack update to complete...")
-                waiter = cf_client.get_waiter('stack_update_complete')
-                waiter.wait(StackName='spokhand-stack')
-                print("Stack update completed successfully!")
+                try:
+                    response = cf_client.update_stack(
+                        StackName='spokhand-stack',
+                        TemplateBody=template_body,
+                        Parameters=parameters,
+                        Capabilities=['CAPABILITY_IAM']
+                    )
+                except ClientError as update_error:
+                    if 'No updates are to be performed' not in str(update_error):
+                        raise
+                    print("Stack is already up to date.")
+                else:
+                    print(f"Stack update initiated: {response['StackId']}")
+                    print("Waiting for stack update to complete...")
+                    waiter = cf_client.get_waiter('stack_update_complete')
+                    waiter.wait(StackName='spokhand-stack')
+                    print("Stack update completed successfully!")
             else:
                 print(f"Error deploying infrastructure: {str(e)}")
                 return
@@ -104,10 +187,6 @@ def deploy_infrastructure():
             
     except ClientError as e:
         print(f"Error deploying infrastructure: {str(e)}")
-    finally:
-        # Clean up
-        if os.path.exists('lambda_function.zip'):
-            os.remove('lambda_function.zip')
 
 if __name__ == '__main__':
     deploy_infrastructure() 
\ No newline at end of file
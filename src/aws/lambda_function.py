@@ -2,6 +2,82 @@ import json
 import boto3
 import os
 from datetime import datetime
+from urllib.parse import unquote_plus
+
+from video_pipeline import PROCESSED_PREFIX, output_prefix, process_s3_object, should_process
+
+# The transcode stage needs ffmpeg/ffprobe (an ffmpeg layer), so it only
+# runs when TRANSCODE_VIDEOS=1; infrastructure.yaml sets it with the layer
+TRANSCODE_VIDEOS = os.environ.get('TRANSCODE_VIDEOS', '0') == '1'
+
+# Bump whenever the processing logic changes; the backfill runner
+# reprocesses every object whose metadata carries an older version
+PROCESSING_VERSION = '2'
+
+def metadata_key_for(key):
+    """S3 key of the metadata file written for ``key``"""
+    return f"metadata/{key}.json"
+
+def is_current(s3, bucket, key):
+    """
+    Check whether ``key`` was already processed by this PROCESSING_VERSION
+
+    The version is stored as user metadata on the metadata object, so a
+    HEAD request is enough.
+    """
+    try:
+        response = s3.head_object(Bucket=bucket, Key=metadata_key_for(key))
+    except s3.exceptions.ClientError:
+        return False
+    return response.get('Metadata', {}).get('processing-version') == PROCESSING_VERSION
+
+def process_object(s3, bucket, key):
+    """
+    Process one uploaded object and write its metadata file
+
+    Shared by lambda_handler and the backfill runner (backfill.py).
+
+    Args:
+        s3: boto3 S3 client
+        bucket: Bucket holding the object
+        key: Key of the object
+
+    Returns:
+        dict: The metadata written to S3; it has a ``transcode_error``
+        field if the transcode stage failed
+    """
+    print(f"Processing file: {key}")
+
+    # Create a metadata file
+    metadata = {
+        'filename': key,
+        'processed_at': datetime.now().isoformat(),
+        'processing_version': PROCESSING_VERSION,
+        'status': 'processed'
+    }
+
+    # Transcode to H.264 and write the keyframe index and previews. A
+    # failed transcode is recorded but does not stop the metadata write.
+    if TRANSCODE_VIDEOS and should_process(key):
+        try:
+            index = process_s3_object(s3, bucket, key)
+        except Exception as e:
+            print(f"Transcode failed for {key}: {str(e)}")
+            metadata['transcode_error'] = str(e)
+        else:
+            metadata['processed_prefix'] = output_prefix(key)
+            metadata['duration'] = index['duration']
+            metadata['frame_count'] = index['frame_count']
+
+    # Save metadata back to S3. Without the version marker a failed
+    # transcode counts as stale, so the backfill runner retries it.
+    s3.put_object(
+        Bucket=bucket,
+        Key=metadata_key_for(key),
+        Body=json.dumps(metadata),
+        Metadata={} if 'transcode_error' in metadata else {'processing-version': PROCESSING_VERSION}
+    )
+    return metadata
 
 def lambda_handler(event, context):
     """
@@ -10,7 +86,7 @@ def lambda_handler(event, context):
     # Initialize S3 client
     s3 = boto3.client('s3')
     bucket_name = os.environ['S3_BUCKET_NAME']
-    
+
     try:
         # Get the uploaded file details from the event
         records = event.get('Records', [])
@@ -18,40 +94,19 @@ def lambda_handler(event, context):
             # Get the S3 object details
             s3_event = record.get('s3', {})
             bucket = s3_event.get('bucket', {}).get('name')
-            key = s3_event.get('object', {}).get('key')
-            
-            if bucket == bucket_name:
-                # Process the uploaded file
-                response = s3.get_object(Bucket=bucket, Key=key)
-                file_content = response['Body'].read()
-                
-                # TODO: Add your sign language processing logic here
-                # For now, we'll just log the event
-                print(f"Processing file: {key}")
-                
-                # Create a metadata file
-                metadata = {
-                    'filename': key,
-                    'processed_at': datetime.now().isoformat(),
-                    'status': 'processed'
-                }
-                
-                # Save metadata back to S3
-                metadata_key = f"metadata/{key}.json"
-                s3.put_object(
-                    Bucket=bucket_name,
-                    Key=metadata_key,
-                    Body=json.dumps(metadata)
-                )
-                
+            key = unquote_plus(s3_event.get('object', {}).get('key', ''))
+
+            if bucket == bucket_name and not key.startswith(PROCESSED_PREFIX):
+                process_object(s3, bucket_name, key)
+
         return {
             'statusCode': 200,
             'body': json.dumps('Processing completed successfully')
         }
-        
+
     except Exception as e:
         print(f"Error processing file: {str(e)}")
         return {
             'statusCode': 500,
             'body': json.dumps(f'Error: {str(e)}')
-        } 
\ No newline at end of file
+        }
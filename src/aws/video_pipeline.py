@@ -0,0 +1,331 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ffmpeg/ffprobe binaries; on Lambda these come from a layer under /opt/bin
+FFMPEG = os.environ.get("FFMPEG_PATH", "ffmpeg")
+FFPROBE = os.environ.get("FFPROBE_PATH", "ffprobe")
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov")
+PROCESSED_PREFIX = "processed/"
+INDEX_VERSION = 1
+
+# Transcode settings: a fixed GOP puts a keyframe every GOP_SIZE frames, so
+# the keyframe covering any frame is found by integer division.
+TARGET_FPS = 30
+GOP_SIZE = 30
+CRF = 23
+PRESET = "veryfast"
+
+# Preview settings
+PREVIEW_WIDTH = 320
+PREVIEW_SECONDS = 2
+POSTER_WIDTH = 640
+
+
+def output_prefix(key: str) -> str:
+    """
+    S3 prefix holding the pipeline outputs for a source video
+
+    Args:
+        key: Key of the source video, e.g. ``oak_videos/clip.mp4``
+
+    Returns:
+        str: Prefix such as ``processed/oak_videos/clip/``
+    """
+    stem = os.path.splitext(key)[0]
+    return f"{PROCESSED_PREFIX}{stem}/"
+
+
+def should_process(key: str) -> bool:
+    """Only raw videos are processed, never the pipeline's own outputs"""
+    return (
+        not key.startswith(PROCESSED_PREFIX)
+        and not key.startswith("metadata/")
+        and key.lower().endswith(VIDEO_EXTENSIONS)
+    )
+
+
+def _run(cmd: List[str]) -> str:
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{cmd[0]} failed: {result.stderr.strip()[-500:]}")
+    return result.stdout
+
+
+def transcode(input_path: Path, output_path: Path, fps: int = TARGET_FPS, gop: int = GOP_SIZE):
+    """
+    Transcode a recording to H.264 with a fixed keyframe interval
+
+    Args:
+        input_path: Source video (e.g. mp4v from OakCamera)
+        output_path: Destination MP4
+        fps: Output frame rate
+        gop: Frames between keyframes
+    """
+    _run([
+        FFMPEG, "-y", "-loglevel", "error",
+        "-i", str(input_path),
+        "-an",
+        "-c:v", "libx264",
+        "-preset", PRESET,
+        "-crf", str(CRF),
+        "-pix_fmt", "yuv420p",
+        "-r", str(fps),
+        "-g", str(gop),
+        "-keyint_min", str(gop),
+        "-sc_threshold", "0",
+        # Put the moov atom first so the header is one contiguous range
+        "-movflags", "+faststart",
+        str(output_path)
+    ])
+
+
+def build_index(video_path: Path, gop: int = GOP_SIZE) -> Dict:
+    """
+    Build the keyframe/time index sidecar for a transcoded video
+
+    Keyframe ``i`` starts frame ``i * gop``; its entry holds the
+    presentation time and byte offset of that keyframe in the file.
+
+    Args:
+        video_path: H.264 MP4 produced by ``transcode``
+        gop: Frames between keyframes used when transcoding
+
+    Returns:
+        dict: Index ready to be serialised as JSON
+    """
+    probe = json.loads(_run([
+        FFPROBE, "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries",
+        "stream=width,height,r_frame_rate,codec_name:format=duration,size:packet=pts_time,pos,flags",
+        "-of", "json",
+        str(video_path)
+    ]))
+
+    stream = probe["streams"][0]
+    num, den = stream["r_frame_rate"].split("/")
+    packets = probe.get("packets", [])
+    keyframes = [
+        [float(packet["pts_time"]), int(packet["pos"])]
+        for packet in packets
+        if "K" in packet.get("flags", "")
+    ]
+    keyframes.sort()
+
+    return {
+        "version": INDEX_VERSION,
+        "codec": stream["codec_name"],
+        "width": stream["width"],
+        "height": stream["height"],
+        "fps": float(num) / float(den),
+        "gop": gop,
+        "frame_count": len(packets),
+        "duration": float(probe["format"]["duration"]),
+        "size": int(probe["format"]["size"]),
+        # Everything before the first packet is the container header
+        "header_size": min(int(packet["pos"]) for packet in packets),
+        "keyframes": keyframes
+    }
+
+
+def frame_byte_range(index: Dict, start_frame: int, end_frame: int) -> Tuple[int, Optional[int]]:
+    """
+    Byte range that must be read to decode frames ``[start_frame, end_frame)``
+
+    Args:
+        index: Index produced by ``build_index``
+        start_frame: First frame needed
+        end_frame: One past the last frame needed
+
+    Returns:
+        tuple: ``(first_byte, last_byte)`` inclusive, with ``last_byte``
+        None when the range runs to the end of the file
+    """
+    gop = index["gop"]
+    keyframes = index["keyframes"]
+    first = min(max(start_frame, 0) // gop, len(keyframes) - 1)
+    # The range ends where the keyframe after the last needed frame begins
+    after = (max(end_frame, start_frame + 1) - 1) // gop + 1
+    first_byte = keyframes[first][1]
+    if after >= len(keyframes):
+        return first_byte, None
+    return first_byte, keyframes[after][1] - 1
+
+
+def fetch_frame_range(
+    s3_client,
+    bucket: str,
+    key: str,
+    index: Dict,
+    start_frame: int,
+    end_frame: int,
+    dest: Path
+) -> Path:
+    """
+    Download only the bytes needed to decode a frame range
+
+    The header and the keyframe-aligned data range are written at their
+    original offsets into a sparse local file, which OpenCV or ffmpeg can
+    open and seek to ``start_frame`` as if it were the whole video.
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Bucket holding the transcoded video
+        key: Key of the transcoded video
+        index: Index of that video
+        start_frame: First frame needed
+        end_frame: One past the last frame needed
+        dest: Local path for the sparse file
+
+    Returns:
+        Path: ``dest``
+    """
+    first_byte, last_byte = frame_byte_range(index, start_frame, end_frame)
+    ranges = [(0, index["header_size"] - 1), (first_byte, last_byte)]
+
+    with open(dest, "wb") as f:
+        f.truncate(index["size"])
+        for start, end in ranges:
+            byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end}"
+            response = s3_client.get_object(Bucket=bucket, Key=key, Range=byte_range)
+            f.seek(start)
+            shutil.copyfileobj(response["Body"], f)
+    return dest
+
+
+def make_previews(video_path: Path, output_dir: Path, seconds: int = PREVIEW_SECONDS) -> List[Path]:
+    """
+    Cut low-resolution preview segments of ``seconds`` each
+
+    Args:
+        video_path: Transcoded video
+        output_dir: Directory to write ``preview_NNN.mp4`` into
+        seconds: Length of each preview segment
+
+    Returns:
+        list: Paths of the preview segments in order
+    """
+    _run([
+        FFMPEG, "-y", "-loglevel", "error",
+        "-i", str(video_path),
+        "-an",
+        "-vf", f"scale={PREVIEW_WIDTH}:-2",
+        "-c:v", "libx264",
+        "-preset", PRESET,
+        "-crf", "28",
+        "-pix_fmt", "yuv420p",
+        "-force_key_frames", f"expr:gte(t,n_forced*{seconds})",
+        "-f", "segment",
+        "-segment_time", str(seconds),
+        "-reset_timestamps", "1",
+        "-segment_format_options", "movflags=+faststart",
+        str(output_dir / "preview_%03d.mp4")
+    ])
+    return sorted(output_dir.glob("preview_*.mp4"))
+
+
+def make_poster(video_path: Path, output_path: Path, duration: float):
+    """Grab a single JPEG poster frame from the middle of the first second"""
+    _run([
+        FFMPEG, "-y", "-loglevel", "error",
+        "-ss", f"{min(1.0, duration / 2):.3f}",
+        "-i", str(video_path),
+        "-frames:v", "1",
+        "-vf", f"scale={POSTER_WIDTH}:-2",
+        "-q:v", "3",
+        str(output_path)
+    ])
+
+
+def process_local(input_path: Path, output_dir: Path) -> Dict:
+    """
+    Run the full pipeline on a local file
+
+    Args:
+        input_path: Source video
+        output_dir: Directory for ``video.mp4``, ``index.json``,
+            ``poster.jpg`` and ``preview_NNN.mp4``
+
+    Returns:
+        dict: The keyframe index, with the preview file names added
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    video_path = output_dir / "video.mp4"
+
+    transcode(input_path, video_path)
+    index = build_index(video_path)
+    make_poster(video_path, output_dir / "poster.jpg", index["duration"])
+    previews = make_previews(video_path, output_dir)
+
+    index["source_size"] = input_path.stat().st_size
+    index["previews"] = [path.name for path in previews]
+    index["preview_seconds"] = PREVIEW_SECONDS
+    index["processed_at"] = datetime.now().isoformat()
+    with open(output_dir / "index.json", "w") as f:
+        json.dump(index, f)
+    return index
+
+
+def process_s3_object(s3_client, bucket: str, key: str) -> Dict:
+    """
+    Run the pipeline on an S3 object and upload the outputs next to it
+
+    Outputs are written under ``output_prefix(key)``.
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Bucket holding the source video
+        key: Key of the source video
+
+    Returns:
+        dict: The keyframe index
+    """
+    prefix = output_prefix(key)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        input_path = tmp / f"source{os.path.splitext(key)[1]}"
+        s3_client.download_file(bucket, key, str(input_path))
+
+        output_dir = tmp / "out"
+        index = process_local(input_path, output_dir)
+
+        content_types = {".mp4": "video/mp4", ".jpg": "image/jpeg", ".json": "application/json"}
+        # Upload the index last so its presence means the outputs are complete
+        outputs = sorted(output_dir.iterdir(), key=lambda path: path.name == "index.json")
+        for path in outputs:
+            s3_client.upload_file(
+                str(path),
+                bucket,
+                prefix + path.name,
+                ExtraArgs={"ContentType": content_types.get(path.suffix, "application/octet-stream")}
+            )
+
+    print(
+        f"Transcoded {key}: {index['source_size'] / 1e6:.1f} MB -> {index['size'] / 1e6:.1f} MB, "
+        f"{len(index['keyframes'])} keyframes, {len(index['previews'])} previews"
+    )
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcode and index recordings")
+    parser.add_argument("source", help="Local video path, or S3 key when --bucket is given")
+    parser.add_argument("--bucket", help="Process the S3 object in this bucket")
+    parser.add_argument("--output-dir", default="processed", help="Output directory for local files")
+    args = parser.parse_args()
+
+    if args.bucket:
+        import boto3
+        process_s3_object(boto3.client("s3"), args.bucket, args.source)
+    else:
+        source = Path(args.source)
+        index = process_local(source, Path(args.output_dir) / source.stem)
+        print(json.dumps({k: v for k, v in index.items() if k != "keyframes"}, indent=2))
@@ -0,0 +1,392 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+if __name__ == "__main__":
+    # Make data.landmarks importable when the builder is run as a script
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.landmarks import FEATURE_SIZE, FRAMES, LandmarkExtractor
+
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.json"
+LABELS_NAME = "labels.json"
+UNLABELED = "unlabeled"
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov")
+
+
+class S3Source:
+    """Videos under a prefix of an S3 bucket (or a moto/MinIO stand-in)"""
+
+    def __init__(self, bucket: str, prefix: str = "oak_videos/", endpoint_url: Optional[str] = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self._client = None
+
+    def __getstate__(self):
+        # boto3 clients cannot be pickled; each worker process builds its own
+        state = self.__dict__.copy()
+        state["_client"] = None
+        return state
+
+    @property
+    def uri(self) -> str:
+        return f"s3://{self.bucket}/{self.prefix}"
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url)
+        return self._client
+
+    def list_objects(self) -> Iterator[Dict]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                yield {"key": obj["Key"], "etag": obj["ETag"].strip('"'), "size": obj["Size"]}
+
+    def download(self, key: str, dest: str):
+        self.client.download_file(self.bucket, key, dest)
+
+    def upload(self, path: str, key: str):
+        self.client.upload_file(path, self.bucket, key)
+
+
+class DirectorySource:
+    """Directory laid out like the bucket, for local builds without S3"""
+
+    def __init__(self, root: str, prefix: str = "oak_videos/"):
+        self.root = Path(root)
+        self.prefix = prefix
+
+    @property
+    def uri(self) -> str:
+        return (self.root / self.prefix).resolve().as_uri()
+
+    def list_objects(self) -> Iterator[Dict]:
+        base = self.root / self.prefix
+        if not base.exists():
+            return
+        for path in sorted(base.rglob("*")):
+            if path.is_file():
+                stat = path.stat()
+                yield {
+                    "key": path.relative_to(self.root).as_posix(),
+                    "etag": f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+                    "size": stat.st_size
+                }
+
+    def download(self, key: str, dest: str):
+        shutil.copyfile(self.root / key, dest)
+
+    def upload(self, path: str, key: str):
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+
+
+def open_source(spec: str, prefix: str = "oak_videos/", endpoint_url: Optional[str] = None):
+    """
+    Create a source from ``s3://bucket`` or a local directory path
+
+    Args:
+        spec: ``s3://bucket[/prefix]`` or a directory
+        prefix: Prefix to list when ``spec`` does not include one
+        endpoint_url: Optional S3 endpoint (moto server, MinIO, ...)
+    """
+    if spec.startswith("s3://"):
+        bucket, _, spec_prefix = spec[len("s3://"):].partition("/")
+        if spec_prefix and not spec_prefix.endswith("/"):
+            spec_prefix += "/"
+        return S3Source(bucket, spec_prefix or prefix, endpoint_url)
+    return DirectorySource(spec, prefix)
+
+
+def label_from_key(key: str, prefix: str) -> str:
+    """
+    Sign label of a video: the first directory below the prefix
+
+    ``oak_videos/hello/clip.mp4`` is labelled ``hello``; videos directly
+    under the prefix are labelled ``unlabeled``. The app uploads videos
+    recorded or uploaded with a sign label to ``oak_videos/<sign>/``.
+    """
+    relative = key[len(prefix):] if key.startswith(prefix) else key
+    parts = relative.split("/")
+    return parts[0] if len(parts) > 1 and parts[0] else UNLABELED
+
+
+# Per-process state for the extraction workers
+_worker_source = None
+_worker_extractor = None
+
+
+def _init_worker(source):
+    global _worker_source, _worker_extractor
+    _worker_source = source
+    _worker_extractor = LandmarkExtractor(frames=FRAMES)
+
+
+def _extract_object(key: str) -> Tuple[str, Optional[np.ndarray], Optional[str]]:
+    """Download one video and extract its features inside a worker process"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        local_path = os.path.join(tmp_dir, "clip" + os.path.splitext(key)[1])
+        try:
+            _worker_source.download(key, local_path)
+            return key, _worker_extractor.extract(local_path), None
+        except Exception as e:
+            return key, None, str(e)
+
+
+def _load_json(path: Path, default):
+    if path.exists():
+        with open(path, "r") as f:
+            return json.load(f)
+    return default
+
+
+def _write_json(path: Path, data):
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetBuilder:
+    """
+    Incrementally pack landmark samples from a video source into shards.
+
+    The output directory holds:
+
+    - ``shard-NNNNNN.npz``: ``X`` (float32, [n, FEATURE_SIZE]), ``y``
+      (int64 label ids) and ``keys`` (source object keys). Shards are
+      immutable once written.
+    - ``index.json``: shard list with sample counts, checksums and the rows
+      masked out because their source object changed or was deleted.
+    - ``labels.json``: append-only list of class names; a label's id is its
+      position, so ids stay stable across builds.
+    - ``manifest.json``: every source object seen, with its ETag and where
+      its sample lives, so the next build only processes what changed.
+    """
+
+    def __init__(self, source, output_dir: str, shard_size: int = 1024, num_workers: Optional[int] = None):
+        """
+        Args:
+            source: S3Source or DirectorySource to read videos from
+            output_dir: Directory for shards, index, labels and manifest
+            shard_size: Maximum samples per shard
+            num_workers: Extraction processes (defaults to CPU count)
+        """
+        self.source = source
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.shard_size = shard_size
+        self.num_workers = num_workers or os.cpu_count()
+
+        self.manifest = _load_json(self.output_dir / MANIFEST_NAME, {"objects": {}, "skipped": {}})
+        self.index = _load_json(
+            self.output_dir / INDEX_NAME,
+            {"version": 1, "feature_size": FEATURE_SIZE, "frames": FRAMES, "num_samples": 0, "shards": []}
+        )
+        self.classes: List[str] = _load_json(self.output_dir / LABELS_NAME, {"classes": []})["classes"]
+
+    def plan(self) -> Tuple[List[Dict], List[str], List[str]]:
+        """
+        Compare the source listing with the manifest
+
+        Videos without a sign label are left out of the dataset; training
+        on them would only add a catch-all ``unlabeled`` class.
+
+        Returns:
+            tuple: (labelled objects that are new or changed, keys that
+            disappeared or were skipped before, keys of unlabelled videos)
+        """
+        seen = set()
+        todo = []
+        unlabeled = []
+        known = self.manifest["objects"]
+        skipped = self.manifest["skipped"]
+        prefix = getattr(self.source, "prefix", "")
+        for obj in self.source.list_objects():
+            if not obj["key"].lower().endswith(VIDEO_EXTENSIONS):
+                continue
+            if label_from_key(obj["key"], prefix) == UNLABELED:
+                unlabeled.append(obj["key"])
+                continue
+            seen.add(obj["key"])
+            previous = known.get(obj["key"]) or skipped.get(obj["key"])
+            if previous is None or previous["etag"] != obj["etag"]:
+                todo.append(obj)
+        removed = [key for key in list(known) + list(skipped) if key not in seen]
+        return todo, removed, unlabeled
+
+    def _mask(self, key: str):
+        """Hide the sample of a changed or deleted object from readers"""
+        entry = self.manifest["objects"].pop(key, None)
+        if entry is None:
+            return
+        shard = self.index["shards"][entry["shard"]]
+        shard["masked"].append(entry["row"])
+        self.index["num_samples"] -= 1
+
+    def _label_id(self, label: str) -> int:
+        if label not in self.classes:
+            self.classes.append(label)
+        return self.classes.index(label)
+
+    def _write_shard(self, samples: List[Tuple[Dict, np.ndarray]]):
+        shard_id = len(self.index["shards"])
+        name = f"shard-{shard_id:06d}.npz"
+        path = self.output_dir / name
+        prefix = getattr(self.source, "prefix", "")
+
+        X = np.stack([features for _, features in samples]).astype(np.float32)
+        y = np.array([self._label_id(label_from_key(obj["key"], prefix)) for obj, _ in samples], dtype=np.int64)
+        keys = np.array([obj["key"] for obj, _ in samples])
+        # Uncompressed: float landmarks compress poorly and readers load
+        # each shard whole, so this skips an inflate step per shard
+        np.savez(path, X=X, y=y, keys=keys)
+
+        self.index["shards"].append({
+            "name": name,
+            "count": len(samples),
+            "masked": [],
+            "bytes": path.stat().st_size,
+            "sha256": _sha256(path)
+        })
+        self.index["num_samples"] += len(samples)
+        for row, (obj, _) in enumerate(samples):
+            self.manifest["objects"][obj["key"]] = {"etag": obj["etag"], "shard": shard_id, "row": row}
+            self.manifest["skipped"].pop(obj["key"], None)
+        self._save()
+
+    def _save(self):
+        self.manifest["built_at"] = datetime.now().isoformat()
+        _write_json(self.output_dir / LABELS_NAME, {"classes": self.classes})
+        _write_json(self.output_dir / INDEX_NAME, self.index)
+        # Manifest last: a crash before this point only repeats work
+        _write_json(self.output_dir / MANIFEST_NAME, self.manifest)
+
+    def build(self) -> Dict:
+        """
+        Process new and changed objects and append them as new shards
+
+        Returns:
+            dict: Build statistics
+        """
+        start = time.time()
+        shards_before = len(self.index["shards"])
+        todo, removed, unlabeled = self.plan()
+        for key in removed:
+            self._mask(key)
+            self.manifest["skipped"].pop(key, None)
+        for obj in todo:
+            self._mask(obj["key"])
+
+        if unlabeled:
+            print(f"Ignoring {len(unlabeled)} videos without a sign label (expected {self.source.prefix}<sign>/<file>)")
+        if not todo and self.index["num_samples"] == 0:
+            raise ValueError(
+                f"No labelled videos under {self.source.uri}: the label is the first "
+                f"directory below the prefix, e.g. {self.source.prefix}hello/clip.mp4"
+            )
+        print(f"{len(todo)} new or changed videos, {len(removed)} removed")
+        pending: List[Tuple[Dict, np.ndarray]] = []
+        failed = 0
+        if todo:
+            by_key = {obj["key"]: obj for obj in todo}
+            with ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.source,)
+            ) as executor:
+                futures = [executor.submit(_extract_object, obj["key"]) for obj in todo]
+                for done, future in enumerate(as_completed(futures), 1):
+                    key, features, error = future.result()
+                    if error is not None:
+                        print(f"Skipping {key}: {error}")
+                        self.manifest["skipped"][key] = {"etag": by_key[key]["etag"], "error": error}
+                        failed += 1
+                    else:
+                        pending.append((by_key[key], features))
+                    if len(pending) >= self.shard_size:
+                        self._write_shard(pending[:self.shard_size])
+                        pending = pending[self.shard_size:]
+                    if done % 100 == 0:
+                        print(f"Extracted {done}/{len(todo)} videos")
+
+        if pending:
+            self._write_shard(pending)
+        self._save()
+
+        stats = {
+            "processed": len(todo) - failed,
+            "failed": failed,
+            "removed": len(removed),
+            "unlabeled": len(unlabeled),
+            "new_shards": len(self.index["shards"]) - shards_before,
+            "total_samples": self.index["num_samples"],
+            "num_classes": len(self.classes),
+            "seconds": round(time.time() - start, 2)
+        }
+        print(json.dumps(stats))
+        return stats
+
+    def publish(self, target):
+        """
+        Upload shards not yet published to ``target``, then the index,
+        labels and manifest
+
+        Args:
+            target: S3Source or DirectorySource to publish under its prefix
+        """
+        published = self.manifest.setdefault("published", {}).setdefault(target.uri, [])
+        for shard in self.index["shards"]:
+            if shard["name"] not in published:
+                target.upload(str(self.output_dir / shard["name"]), target.prefix + shard["name"])
+                published.append(shard["name"])
+        self._save()
+        for name in (LABELS_NAME, INDEX_NAME, MANIFEST_NAME):
+            target.upload(str(self.output_dir / name), target.prefix + name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build landmark dataset shards from recorded videos")
+    parser.add_argument("source", help="s3://bucket[/prefix] or a directory laid out like the bucket")
+    parser.add_argument("--prefix", default="oak_videos/", help="Key prefix of the videos")
+    parser.add_argument("--output-dir", default="src/data/oak_shards", help="Local shard directory")
+    parser.add_argument("--shard-size", type=int, default=1024, help="Samples per shard")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes")
+    parser.add_argument("--endpoint-url", default=os.getenv("AWS_ENDPOINT_URL"), help="S3 endpoint, e.g. a moto server")
+    parser.add_argument("--publish", help="s3://bucket/prefix or directory to upload the shards to")
+    args = parser.parse_args()
+
+    builder = DatasetBuilder(
+        open_source(args.source, args.prefix, args.endpoint_url),
+        args.output_dir,
+        shard_size=args.shard_size,
+        num_workers=args.workers
+    )
+    builder.build()
+    if args.publish:
+        builder.publish(open_source(args.publish, "datasets/oak/", args.endpoint_url))
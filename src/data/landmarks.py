@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+
+# Layout of one sample: FRAMES x NUM_HANDS x NUM_LANDMARKS x COORDS, flattened
+FRAMES = 32
+NUM_HANDS = 2
+NUM_LANDMARKS = 21
+COORDS = 3
+FEATURE_SIZE = FRAMES * NUM_HANDS * NUM_LANDMARKS * COORDS
+
+# Hand slot used for each MediaPipe handedness label
+HAND_SLOTS = {"Left": 0, "Right": 1}
+
+
+class LandmarkExtractor:
+    """Turn a video clip into a fixed-size hand landmark feature vector"""
+
+    def __init__(self, frames: int = FRAMES, min_detection_confidence: float = 0.5):
+        """
+        Args:
+            frames: Number of frames sampled evenly across the clip
+            min_detection_confidence: MediaPipe hand detection threshold
+        """
+        # Imported here so that modules only needing the layout constants
+        # above do not pay for loading MediaPipe
+        import mediapipe as mp
+
+        self.frames = frames
+        self.hands = mp.solutions.hands.Hands(
+            # Sampled frames are too far apart for tracking to help
+            static_image_mode=True,
+            max_num_hands=NUM_HANDS,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=0.5
+        )
+
+    def extract(self, video_path: str) -> np.ndarray:
+        """
+        Extract landmarks from ``frames`` evenly spaced frames of a video
+
+        Missing hands are left as zeros. Frames between the sampled ones are
+        skipped with ``grab()`` so they are never decoded to BGR.
+
+        Args:
+            video_path: Path to the video file
+
+        Returns:
+            np.ndarray: float32 array of shape (FEATURE_SIZE,)
+
+        Raises:
+            ValueError: If the video cannot be read or no hand is found
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+
+        try:
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if total <= 0:
+                raise ValueError(f"Video has no frames: {video_path}")
+            wanted = np.linspace(0, total - 1, self.frames).round().astype(int)
+
+            landmarks = np.zeros((self.frames, NUM_HANDS, NUM_LANDMARKS, COORDS), dtype=np.float32)
+            found = False
+            position = 0
+            for slot, frame_index in enumerate(wanted):
+                if slot > 0 and wanted[slot - 1] == frame_index:
+                    # Short clips repeat frames; reuse the previous result
+                    landmarks[slot] = landmarks[slot - 1]
+                    continue
+                while position < frame_index:
+                    cap.grab()
+                    position += 1
+                ret, frame = cap.read()
+                position += 1
+                if not ret:
+                    break
+
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                results = self.hands.process(rgb_frame)
+                if not results.multi_hand_landmarks:
+                    continue
+                for hand_landmarks, handedness in zip(
+                    results.multi_hand_landmarks,
+                    results.multi_handedness
+                ):
+                    hand = HAND_SLOTS.get(handedness.classification[0].label, 0)
+                    landmarks[slot, hand] = [
+                        (point.x, point.y, point.z) for point in hand_landmarks.landmark
+                    ]
+                    found = True
+        finally:
+            cap.release()
+
+        if not found:
+            raise ValueError(f"No hands detected in video: {video_path}")
+        return landmarks.reshape(-1)
+
+    def close(self):
+        self.hands.close()
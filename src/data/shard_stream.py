@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, IterableDataset, get_worker_info
+
+DEFAULT_CACHE_DIR = os.path.expanduser(os.getenv("SHARD_CACHE_DIR", "~/.cache/spokhand/shards"))
+
+
+def _is_remote(url: str) -> bool:
+    return url.startswith(("s3://", "http://", "https://"))
+
+
+def _join(base_url: str, name: str) -> str:
+    return base_url.rstrip("/") + "/" + name
+
+
+def fetch(url: str, dest: Path, endpoint_url: Optional[str] = None):
+    """
+    Download ``url`` (``s3://``, ``http(s)://`` or a local path) to ``dest``
+
+    Args:
+        url: Location of the file
+        dest: Local destination path
+        endpoint_url: Optional S3 endpoint (moto server, MinIO, ...)
+    """
+    if url.startswith("s3://"):
+        import boto3
+        bucket, _, key = url[len("s3://"):].partition("/")
+        boto3.client("s3", endpoint_url=endpoint_url).download_file(bucket, key, str(dest))
+    elif url.startswith(("http://", "https://")):
+        with urllib.request.urlopen(url) as response, open(dest, "wb") as f:
+            shutil.copyfileobj(response, f)
+    else:
+        shutil.copyfile(url, dest)
+
+
+def read_json(url: str, endpoint_url: Optional[str] = None) -> Dict:
+    """Read a small JSON document from any supported location"""
+    if not _is_remote(url):
+        with open(url, "r") as f:
+            return json.load(f)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "doc.json"
+        fetch(url, path, endpoint_url)
+        with open(path, "r") as f:
+            return json.load(f)
+
+
+class ShardCache:
+    """
+    Bounded least-recently-used cache of shard files on local disk.
+
+    Shards are immutable, so a cached file never needs revalidation. The
+    cache may be shared by several DataLoader worker processes: files are
+    published with an atomic rename and recency is tracked with mtimes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = 20 * 1024 ** 3):
+        """
+        Args:
+            cache_dir: Directory holding cached shards
+            max_bytes: Upper bound on the total size of cached shards
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def path_for(self, url: str) -> Path:
+        base, _, name = url.rpartition("/")
+        # Namespace by dataset location so equal shard names do not collide
+        namespace = hashlib.sha1(base.encode()).hexdigest()[:12]
+        return self.cache_dir / namespace / name
+
+    def get(self, url: str, endpoint_url: Optional[str] = None) -> Path:
+        """
+        Return a local path for ``url``, downloading it on a cache miss
+
+        Args:
+            url: Remote shard location
+            endpoint_url: Optional S3 endpoint
+
+        Returns:
+            Path: Path of the cached shard
+        """
+        path = self.path_for(url)
+        if path.exists():
+            os.utime(path)
+            return path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        os.close(fd)
+        try:
+            fetch(url, Path(tmp_name), endpoint_url)
+            os.replace(tmp_name, path)
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[Path] = None):
+        """Delete least recently used shards until the cache fits its budget"""
+        entries = []
+        for path in self.cache_dir.rglob("*"):
+            if path.is_file() and path.suffix != ".part":
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            # Another worker may have evicted it already
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+class ShardStreamDataset(IterableDataset):
+    """
+    Stream samples from shards written by ``data/build_dataset.py``.
+
+    Shards are fetched from S3, HTTP(S) or a local directory with
+    ``prefetch`` shards downloading ahead on background threads, cached in a
+    bounded local LRU cache, split disjointly across DataLoader workers and
+    shuffled within a buffer. Each item matches ``ASLLexDataset``:
+    ``{'sign': float tensor, 'label': long tensor}``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        shuffle: bool = True,
+        shuffle_buffer: int = 4096,
+        prefetch: int = 2,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        cache_bytes: int = 20 * 1024 ** 3,
+        seed: int = 0,
+        endpoint_url: Optional[str] = os.getenv("AWS_ENDPOINT_URL")
+    ):
+        """
+        Args:
+            url: Dataset location containing ``index.json``, ``labels.json``
+                and the shards (``s3://bucket/prefix``, URL or directory)
+            shuffle: Shuffle shard order and samples within the buffer
+            shuffle_buffer: Number of samples held for shuffling
+            prefetch: Number of shards fetched ahead of the one being read
+            cache_dir: Local shard cache directory (unused for local paths)
+            cache_bytes: Local shard cache budget
+            seed: Base seed; combined with the epoch for reproducible order
+            endpoint_url: Optional S3 endpoint
+        """
+        super().__init__()
+        self.url = url.rstrip("/")
+        self.shuffle = shuffle
+        self.shuffle_buffer = shuffle_buffer
+        self.prefetch = max(1, prefetch)
+        self.cache_dir = cache_dir
+        self.cache_bytes = cache_bytes
+        self.seed = seed
+        self.endpoint_url = endpoint_url
+        self.epoch = 0
+
+        self.index = read_json(_join(self.url, "index.json"), endpoint_url)
+        self.classes: List[str] = read_json(_join(self.url, "labels.json"), endpoint_url)["classes"]
+        self.shards = [shard for shard in self.index["shards"] if shard["count"] > len(shard["masked"])]
+
+    @property
+    def input_size(self) -> int:
+        return self.index["feature_size"]
+
+    @property
+    def num_classes(self) -> int:
+        return len(self.classes)
+
+    def __len__(self) -> int:
+        return self.index["num_samples"]
+
+    def set_epoch(self, epoch: int):
+        """
+        Set the epoch used to seed the next iteration
+
+        Every iteration advances the epoch on its own, which also holds for
+        persistent DataLoader workers. An explicit epoch only reaches worker
+        processes started after this call.
+        """
+        self.epoch = epoch
+
+    def _worker_shards(self, rng: random.Random) -> List[Dict]:
+        shards = list(self.shards)
+        if self.shuffle:
+            rng.shuffle(shards)
+        worker_info = get_worker_info()
+        if worker_info is None:
+            return shards
+        return shards[worker_info.id::worker_info.num_workers]
+
+    def _open(self, cache: Optional[ShardCache], shard: Dict):
+        url = _join(self.url, shard["name"])
+        path = cache.get(url, self.endpoint_url) if cache else Path(url)
+        with np.load(path) as data:
+            X, y = data["X"], data["y"]
+        if shard["masked"]:
+            keep = np.ones(len(y), dtype=bool)
+            keep[shard["masked"]] = False
+            X, y = X[keep], y[keep]
+        return X, y
+
+    def _iter_shards(self, shards: List[Dict]) -> Iterator:
+        """Yield shard arrays in order while later shards download"""
+        cache = ShardCache(self.cache_dir, self.cache_bytes) if _is_remote(self.url) else None
+        with ThreadPoolExecutor(max_workers=self.prefetch) as executor:
+            futures = [executor.submit(self._open, cache, shard) for shard in shards[:self.prefetch]]
+            for i in range(len(shards)):
+                if i + self.prefetch < len(shards):
+                    futures.append(executor.submit(self._open, cache, shards[i + self.prefetch]))
+                yield futures[i].result()
+                futures[i] = None
+
+    def __iter__(self):
+        worker_info = get_worker_info()
+        worker_id = worker_info.id if worker_info is not None else 0
+        epoch = self.epoch
+        self.epoch += 1
+        # Same shard order in every worker, different sample order per worker
+        shard_rng = random.Random(self.seed + epoch)
+        sample_rng = random.Random((self.seed + epoch) * 1000 + worker_id)
+
+        buffer = []
+        for X, y in self._iter_shards(self._worker_shards(shard_rng)):
+            X = torch.from_numpy(X)
+            y = torch.from_numpy(y)
+            for i in range(len(y)):
+                sample = {'sign': X[i], 'label': y[i]}
+                if not self.shuffle or self.shuffle_buffer <= 1:
+                    yield sample
+                    continue
+                if len(buffer) < self.shuffle_buffer:
+                    buffer.append(sample)
+                    continue
+                j = sample_rng.randrange(len(buffer))
+                buffer[j], sample = sample, buffer[j]
+                yield sample
+
+        sample_rng.shuffle(buffer)
+        yield from buffer
+
+
+def get_shard_dataloader(
+    url: str,
+    batch_size: int = 32,
+    shuffle: bool = True,
+    num_workers: int = 4,
+    **dataset_kwargs
+) -> DataLoader:
+    """
+    Create a DataLoader that streams a sharded dataset
+
+    Args:
+        url: Dataset location (``s3://bucket/prefix``, URL or directory)
+        batch_size: Batch size
+        shuffle: Shuffle shards and samples
+        num_workers: DataLoader worker processes; each reads its own shards
+        **dataset_kwargs: Passed on to ``ShardStreamDataset``
+
+    Returns:
+        DataLoader: Loader over a ``ShardStreamDataset``
+    """
+    dataset = ShardStreamDataset(url, shuffle=shuffle, **dataset_kwargs)
+    return DataLoader(
+        dataset,
+        batch_size=batch_size,
+        num_workers=num_workers,
+        pin_memory=torch.cuda.is_available(),
+        persistent_workers=num_workers > 0
+    )
@@ -1,7 +1,5 @@
 import streamlit as st
-import cv2
-import numpy as np
-from aws.config import AWSConfig
+from aws.config import get_aws_config
 import time
 
 # Set page config
@@ -11,8 +9,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize AWS configuration
-aws_config = AWSConfig()
+# Shared AWS configuration; the S3 client is only built when first used
+aws_config = get_aws_config()
 
 # Sidebar
 st.sidebar.title("Spokhand Settings")
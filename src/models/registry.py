@@ -0,0 +1,330 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import torch
+import torch.nn as nn
+
+DEFAULT_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "model_registry")
+
+WEIGHTS_FILE = "model.pt"
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"
+
+# Attempts at claiming a version number when other processes register
+# concurrently
+MAX_REGISTER_ATTEMPTS = 100
+
+ModelFactory = Callable[[int, int], nn.Module]
+
+
+def default_model_factory(input_size: int, num_classes: int) -> nn.Module:
+    """Build the SignLanguageModel trained by train.py"""
+    from models.sign_language_model import SignLanguageModel
+
+    return SignLanguageModel(input_size=input_size, num_classes=num_classes)
+
+
+def _write_atomic(path: Path, text: str):
+    """Write a small file so readers see either the old or the new content"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    """
+    Versioned model checkpoints on the local filesystem
+
+    Layout::
+
+        <root>/versions/v0001/model.pt   state dict (torch.save)
+        <root>/versions/v0001/meta.json  input_size, num_classes, classes, metrics
+        <root>/CURRENT                   name of the version being served
+
+    A version directory is written under a temporary name and renamed into
+    place, and CURRENT is replaced atomically, so a reader never sees a
+    half-written version. Versions are never modified after registration.
+    """
+
+    def __init__(self, root: str = DEFAULT_REGISTRY_DIR):
+        self.root = Path(root)
+        self.versions_dir = self.root / "versions"
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+
+    def versions(self) -> List[str]:
+        """Registered versions, oldest first (by number, so v10000 follows v9999)"""
+        return sorted(
+            (
+                path.name for path in self.versions_dir.iterdir()
+                if path.is_dir() and path.name[:1] == "v" and path.name[1:].isdigit()
+            ),
+            key=lambda name: int(name[1:])
+        )
+
+    def current(self) -> Optional[str]:
+        """The active version, or None if nothing was activated yet"""
+        try:
+            return (self.root / CURRENT_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def metadata(self, version: str) -> Dict:
+        with open(self.versions_dir / version / META_FILE, "r") as f:
+            return json.load(f)
+
+    def weights_path(self, version: str) -> Path:
+        return self.versions_dir / version / WEIGHTS_FILE
+
+    def register(
+        self,
+        state_dict: Dict[str, torch.Tensor],
+        input_size: int,
+        num_classes: int,
+        classes: Optional[Sequence[str]] = None,
+        metrics: Optional[Dict[str, float]] = None,
+        activate: bool = True
+    ) -> str:
+        """
+        Store a checkpoint as a new version
+
+        Args:
+            state_dict: Model weights
+            input_size: Model input size
+            num_classes: Number of output classes
+            classes: Label names in label-encoder order
+            metrics: Optional evaluation metrics (e.g. ``{'val_loss': 0.4}``)
+            activate: Point CURRENT at the new version
+
+        Returns:
+            str: The new version name
+        """
+        staging = Path(tempfile.mkdtemp(dir=self.versions_dir, prefix=".staging-"))
+        try:
+            torch.save(
+                {name: tensor.detach().cpu() for name, tensor in state_dict.items()},
+                staging / WEIGHTS_FILE
+            )
+            meta = {
+                "input_size": int(input_size),
+                "num_classes": int(num_classes),
+                "classes": [str(label) for label in classes] if classes is not None else None,
+                "metrics": metrics or {},
+                "created_at": datetime.now().isoformat(),
+                "torch_version": torch.__version__
+            }
+            with open(staging / META_FILE, "w") as f:
+                json.dump(meta, f, indent=2)
+
+            # Claim the next version number; rename fails if another
+            # process registered it first
+            for _ in range(MAX_REGISTER_ATTEMPTS):
+                number = max((int(name[1:]) for name in self.versions()), default=0) + 1
+                version = f"v{number:04d}"
+                try:
+                    os.rename(staging, self.versions_dir / version)
+                    break
+                except OSError:
+                    if not (self.versions_dir / version).exists():
+                        raise
+            else:
+                raise RuntimeError(f"Could not claim a version number after {MAX_REGISTER_ATTEMPTS} attempts")
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str):
+        """Point CURRENT at ``version``; running recognizers pick it up on refresh"""
+        if not (self.versions_dir / version / META_FILE).exists():
+            raise ValueError(f"Unknown model version: {version}")
+        _write_atomic(self.root / CURRENT_FILE, version + "\n")
+
+    def load(
+        self,
+        version: Optional[str] = None,
+        model_factory: ModelFactory = default_model_factory,
+        device: str = "cpu"
+    ) -> Tuple[nn.Module, Dict]:
+        """
+        Load a version for inference
+
+        The weights are memory-mapped rather than read into memory, and the
+        model is built on the meta device so no time is spent on random
+        initialization. On CPU the parameters stay backed by the mapped
+        file, so worker processes serving the same version share one copy
+        through the page cache.
+
+        Args:
+            version: Version to load (defaults to CURRENT)
+            model_factory: Builds the model from (input_size, num_classes)
+            device: Device to run the model on
+
+        Returns:
+            tuple: (model in eval mode, metadata)
+        """
+        version = version or self.current()
+        if version is None:
+            raise ValueError(f"No model version is active in {self.root}")
+        meta = dict(self.metadata(version), version=version)
+
+        state_dict = torch.load(self.weights_path(version), map_location="cpu", mmap=True, weights_only=True)
+        with torch.device("meta"):
+            model = model_factory(meta["input_size"], meta["num_classes"])
+        model.load_state_dict(state_dict, assign=True)
+        return model.to(device).eval(), meta
+
+
+class LoadedModel(NamedTuple):
+    version: str
+    model: nn.Module
+    meta: Dict
+
+
+class HotSwapRecognizer:
+    """
+    Serve the registry's current model and switch versions without downtime
+
+    A new version is loaded and warmed up next to the one being served and
+    then swapped in with a single reference assignment. ``predict`` takes
+    its own reference to the active model first, so frames already in
+    flight finish on the old version and none are dropped.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        model_factory: ModelFactory = default_model_factory,
+        device: str = "cpu",
+        warmup_batches: int = 2
+    ):
+        self.registry = registry
+        self.model_factory = model_factory
+        self.device = device
+        self.warmup_batches = warmup_batches
+        self._active: Optional[LoadedModel] = None
+        self._swap_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.swap_to()
+
+    @property
+    def version(self) -> Optional[str]:
+        active = self._active
+        return active.version if active else None
+
+    @property
+    def classes(self) -> Optional[List[str]]:
+        active = self._active
+        return active.meta["classes"] if active else None
+
+    def _warm_up(self, loaded: LoadedModel):
+        # Touches every mapped weight page and runs the first-call setup,
+        # so the first real frame after the swap is not slower
+        dummy = torch.zeros(1, 1, loaded.meta["input_size"], device=self.device)
+        with torch.inference_mode():
+            for _ in range(self.warmup_batches):
+                loaded.model(dummy)
+
+    def swap_to(self, version: Optional[str] = None) -> str:
+        """
+        Load, warm up and switch to a version (defaults to CURRENT)
+
+        If loading or warm-up fails the previous version keeps serving and
+        the error is raised.
+
+        Returns:
+            str: The version now being served
+        """
+        with self._swap_lock:
+            version = version or self.registry.current()
+            if self._active is not None and self._active.version == version:
+                return version
+            model, meta = self.registry.load(version, self.model_factory, self.device)
+            loaded = LoadedModel(meta["version"], model, meta)
+            self._warm_up(loaded)
+            self._active = loaded
+            return loaded.version
+
+    def refresh(self) -> bool:
+        """Swap to CURRENT if it changed; returns True when a swap happened"""
+        current = self.registry.current()
+        if current is None or current == self.version:
+            return False
+        self.swap_to(current)
+        return True
+
+    def predict(self, signs: torch.Tensor) -> Tuple[List[Optional[str]], torch.Tensor]:
+        """
+        Classify a batch of landmark features
+
+        Args:
+            signs: Float tensor of shape (batch, input_size)
+
+        Returns:
+            tuple: (predicted class names, class probabilities of shape
+            (batch, num_classes))
+        """
+        active = self._active
+        with torch.inference_mode():
+            probabilities = torch.softmax(active.model(signs.to(self.device).unsqueeze(1)), dim=-1)
+        indices = probabilities.argmax(dim=-1).tolist()
+        classes = active.meta["classes"]
+        names = [classes[i] if classes else None for i in indices]
+        return names, probabilities
+
+    def start_watching(self, interval: float = 5.0):
+        """Poll CURRENT in a background thread and swap when it changes"""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    if self.refresh():
+                        print(f"Now serving model {self.version}")
+                except Exception as e:
+                    print(f"Model swap failed, still serving {self.version}: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the model registry and roll versions forward or back")
+    parser.add_argument("--root", default=DEFAULT_REGISTRY_DIR, help="Registry directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List versions")
+    activate_parser = subparsers.add_parser("activate", help="Serve a version")
+    activate_parser.add_argument("version")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == "list":
+        current = registry.current()
+        for version in registry.versions():
+            meta = registry.metadata(version)
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  {meta['created_at']}  classes={meta['num_classes']}  {json.dumps(meta['metrics'])}")
+    else:
+        registry.activate(args.version)
+        print(f"Activated {args.version}")
@@ -5,9 +5,14 @@ from torch.utils.data import DataLoader
 from tqdm import tqdm
 import logging
 from pathlib import Path
+from typing import Optional
 
 from models.sign_language_model import SignLanguageModel
 from data.asl_lex_loader import get_asl_lex_dataloader, ASLLexDataset
+from data.shard_stream import get_shard_dataloader
+from data.augment import LandmarkAugment
+from models.registry import ModelRegistry
+from utils.train_profiler import TrainingProfiler
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -18,7 +23,9 @@ def train_epoch(
     dataloader: DataLoader,
     criterion: nn.Module,
     optimizer: optim.Optimizer,
-    device: torch.device
+    device: torch.device,
+    augment: Optional[nn.Module] = None,
+    profiler: Optional[TrainingProfiler] = None
 ) -> float:
     """
     Train for one epoch
@@ -29,36 +36,51 @@ def train_epoch(
         criterion: Loss function
         optimizer: Optimizer
         device: Device to train on
+        augment: Optional batch augmentation applied on the device
+        profiler: Optional TrainingProfiler timing each phase of the step
         
     Returns:
         float: Average loss for the epoch
     """
+    profiler = profiler or TrainingProfiler.disabled()
     model.train()
     total_loss = 0
+    num_batches = 0
     
-    for batch in tqdm(dataloader, desc="Training"):
+    for batch in profiler.iterate(tqdm(dataloader, desc="Training"), "train"):
         # Get data
-        signs = batch['sign'].to(device)
-        labels = batch['label'].to(device)
+        with profiler.phase("h2d"):
+            signs = batch['sign'].to(device)
+            labels = batch['label'].to(device)
+        if augment is not None:
+            with profiler.phase("augment"):
+                signs = augment(signs)
         
         # Forward pass
-        outputs = model(signs.unsqueeze(1))
-        loss = criterion(outputs, labels)
+        with profiler.phase("forward"):
+            outputs = model(signs.unsqueeze(1))
+            loss = criterion(outputs, labels)
         
         # Backward pass
-        optimizer.zero_grad()
-        loss.backward()
-        optimizer.step()
+        with profiler.phase("backward"):
+            optimizer.zero_grad()
+            loss.backward()
+        with profiler.phase("optimizer"):
+            optimizer.step()
         
         total_loss += loss.item()
+        num_batches += 1
+        profiler.end_step(len(labels), "train")
     
-    return total_loss / len(dataloader)
+    # Streaming loaders only estimate their length, so count the batches
+    return total_loss / max(num_batches, 1)
 
 def validate(
     model: nn.Module,
     dataloader: DataLoader,
     criterion: nn.Module,
-    device: torch.device
+    device: torch.device,
+    profiler: Optional[TrainingProfiler] = None
 ) -> float:
     """
     Validate the model
@@ -68,33 +90,45 @@ def validate(
         dataloader: DataLoader for validation data
         criterion: Loss function
         device: Device to validate on
+        profiler: Optional TrainingProfiler timing each phase of the step
         
     Returns:
         float: Average loss for validation
     """
+    profiler = profiler or TrainingProfiler.disabled()
     model.eval()
     total_loss = 0
+    num_batches = 0
     
     with torch.no_grad():
-        for batch in tqdm(dataloader, desc="Validation"):
+        for batch in profiler.iterate(tqdm(dataloader, desc="Validation"), "val"):
             # Get data
-            signs = batch['sign'].to(device)
-            labels = batch['label'].to(device)
+            with profiler.phase("h2d"):
+                signs = batch['sign'].to(device)
+                labels = batch['label'].to(device)
             
             # Forward pass
-            outputs = model(signs.unsqueeze(1))
-            loss = criterion(outputs, labels)
+            with profiler.phase("forward"):
+                outputs = model(signs.unsqueeze(1))
+                loss = criterion(outputs, labels)
             
             total_loss += loss.item()
+            num_batches += 1
+            profiler.end_step(len(labels), "val")
     
-    return total_loss / len(dataloader)
+    return total_loss / max(num_batches, 1)
 
 def train(
     data_path: str,
     num_epochs: int = 10,
     batch_size: int = 32,
     learning_rate: float = 0.001,
-    device: str = "cuda" if torch.cuda.is_available() else "cpu"
+    device: str = "cuda" if torch.cuda.is_available() else "cpu",
+    shard_url: Optional[str] = None,
+    num_workers: int = 4,
+    augment: Optional[LandmarkAugment] = None,
+    registry_dir: Optional[str] = None,
+    profiler: Optional[TrainingProfiler] = None
 ):
     """
     Train the sign language model
@@ -105,24 +139,56 @@ def train(
         batch_size: Batch size for training
         learning_rate: Learning rate for optimizer
         device: Device to train on
+        shard_url: If set, stream shards built by data/build_dataset.py from
+            this location (s3://bucket/prefix, URL or directory) instead of
+            reading data_path
+        num_workers: DataLoader workers when streaming shards
+        augment: Optional LandmarkAugment run on each training batch on
+            the device (e.g. ``LandmarkAugment(rotation=10, mirror=0.5)``)
+        registry_dir: If set, register the best checkpoint in this model
+            registry as a new version and make it the served one
+        profiler: Optional TrainingProfiler; writes per-step phase timings,
+            a summary and optionally a Chrome trace for the run (e.g.
+            ``TrainingProfiler("profiles", trace=True)``)
     """
-    # Create data loaders
-    train_loader = get_asl_lex_dataloader(
-        data_path,
-        batch_size=batch_size,
-        shuffle=True
-    )
-    
-    val_loader = get_asl_lex_dataloader(
-        data_path,
-        batch_size=batch_size,
-        shuffle=False
-    )
-    
-    # Dynamically determine input_size and num_classes
-    dataset = ASLLexDataset(data_path)
-    input_size = dataset.X.shape[1]
-    num_classes = len(dataset.label_encoder.classes_)
+    if shard_url:
+        # Create streaming data loaders
+        train_loader = get_shard_dataloader(
+            shard_url,
+            batch_size=batch_size,
+            shuffle=True,
+            num_workers=num_workers
+        )
+        
+        val_loader = get_shard_dataloader(
+            shard_url,
+            batch_size=batch_size,
+            shuffle=False,
+            num_workers=num_workers
+        )
+        
+        input_size = train_loader.dataset.input_size
+        num_classes = train_loader.dataset.num_classes
+        classes = train_loader.dataset.classes
+    else:
+        # Create data loaders
+        train_loader = get_asl_lex_dataloader(
+            data_path,
+            batch_size=batch_size,
+            shuffle=True
+        )
+        
+        val_loader = get_asl_lex_dataloader(
+            data_path,
+            batch_size=batch_size,
+            shuffle=False
+        )
+        
+        # Dynamically determine input_size and num_classes
+        dataset = ASLLexDataset(data_path)
+        input_size = dataset.X.shape[1]
+        num_classes = len(dataset.label_encoder.classes_)
+        classes = list(dataset.label_encoder.classes_)
     
     # Initialize model
     model = SignLanguageModel(
@@ -130,28 +196,50 @@ def train(
         num_classes=num_classes
     ).to(device)
     
+    if augment is not None:
+        augment = augment.to(device).train()
+    
     # Initialize loss and optimizer
     criterion = nn.CrossEntropyLoss()
     optimizer = optim.Adam(model.parameters(), lr=learning_rate)
     
+    profiler = profiler or TrainingProfiler.disabled()
+    profiler.start(device)
+    
     # Training loop
     best_val_loss = float('inf')
-    for epoch in range(num_epochs):
-        logger.info(f"Epoch {epoch+1}/{num_epochs}")
-        
-        # Train
-        train_loss = train_epoch(model, train_loader, criterion, optimizer, device)
-        logger.info(f"Training Loss: {train_loss:.4f}")
-        
-        # Validate
-        val_loss = validate(model, val_loader, criterion, device)
-        logger.info(f"Validation Loss: {val_loss:.4f}")
-        
-        # Save best model
-        if val_loss < best_val_loss:
-            best_val_loss = val_loss
-            torch.save(model.state_dict(), "best_model.pth")
-            logger.info("Saved best model")
+    try:
+        for epoch in range(num_epochs):
+            logger.info(f"Epoch {epoch+1}/{num_epochs}")
+            profiler.set_epoch(epoch)
+            
+            # Train
+            train_loss = train_epoch(model, train_loader, criterion, optimizer, device, augment, profiler)
+            logger.info(f"Training Loss: {train_loss:.4f}")
+            
+            # Validate
+            val_loss = validate(model, val_loader, criterion, device, profiler)
+            logger.info(f"Validation Loss: {val_loss:.4f}")
+            
+            # Save best model
+            if val_loss < best_val_loss:
+                best_val_loss = val_loss
+                torch.save(model.state_dict(), "best_model.pth")
+                logger.info("Saved best model")
+    finally:
+        profiler.stop()
+    
+    # Publish the best checkpoint for the recognizers
+    if registry_dir and best_val_loss < float('inf'):
+        registry = ModelRegistry(registry_dir)
+        version = registry.register(
+            torch.load("best_model.pth", map_location="cpu", mmap=True, weights_only=True),
+            input_size,
+            num_classes,
+            classes=classes,
+            metrics={'val_loss': best_val_loss}
+        )
+        logger.info(f"Registered best model as {version}")
 
 if __name__ == "__main__":
     data_path = "src/data/asl_lex"
@@ -1,52 +1,81 @@
 import streamlit as st
-import boto3
 import os
 from datetime import datetime
-import cv2
-import numpy as np
 from pathlib import Path
-import tempfile
-import depthai as dai
+import sys
 import time
-from typing import Optional, Tuple
-import streamlit.web.server.server as server
-from streamlit.web.server.server import Server
+from typing import TYPE_CHECKING, List, Optional
 
-# AWS credentials from environment or .env file
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
-S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "spokhand-data")
+# Make the shared src/ modules importable when run via `streamlit run`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-# Initialize S3 client
-s3 = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    region_name=AWS_REGION,
-)
+from aws.config import get_aws_config
+from aws.video_pipeline import output_prefix
+from utils.frame_pool import FramePool
+from utils.spool import RecordingSpool, SpoolUploader
+
+# depthai, cv2 and boto3 are imported where first used so that container
+# start-up and the first page render do not pay for them
+if TYPE_CHECKING:
+    import numpy as np
+
+# AWS credentials and bucket come from the environment or .env file
+S3_BUCKET_NAME = get_aws_config().get_bucket_name()
+
+# Local recording spool configuration
+SPOOL_DIR = os.getenv("SPOOL_DIR", "temp_recordings")
+SPOOL_MAX_BYTES = int(os.getenv("SPOOL_MAX_BYTES", str(2 * 1024 ** 3)))
+SEGMENT_SECONDS = float(os.getenv("SEGMENT_SECONDS", "10"))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
 
 # Create Streamlit app
 app = st
 
-# Configure Streamlit for AWS deployment
-server._set_websocket_headers = lambda headers: headers.update({
-    'Access-Control-Allow-Origin': '*',
-    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-    'Access-Control-Allow-Headers': 'Content-Type',
-})
+def configure_server():
+    """Configure Streamlit for AWS deployment"""
+    import streamlit.web.server.server as server
+
+    server._set_websocket_headers = lambda headers: headers.update({
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type',
+    })
+
+def video_key(file_name: str, sign_label: str = "") -> str:
+    """
+    S3 key for an uploaded video
+
+    Labelled videos go to ``oak_videos/<sign>/``, the layout the dataset
+    builder (data/build_dataset.py) reads labels from.
+    """
+    sign = sign_label.strip().lower().replace("/", "_").replace(" ", "_")
+    return f"oak_videos/{sign}/{file_name}" if sign else f"oak_videos/{file_name}"
 
 class OakCamera:
-    def __init__(self):
+    FPS = 30.0
+    FRAME_SIZE = (640, 480)
+
+    def __init__(self, spool: RecordingSpool, segment_seconds: float = SEGMENT_SECONDS):
         self.pipeline = None
         self.device = None
         self.recording = False
         self.video_writer = None
-        self.temp_dir = Path("temp_recordings")
-        self.temp_dir.mkdir(exist_ok=True)
+        self.spool = spool
+        self.segment_frames = max(1, int(round(segment_seconds * self.FPS)))
+        self.session_name = None
+        self.segment_index = 0
+        self.segment_name = None
+        self.frames_in_segment = 0
+        self.segments: List[Path] = []
+        self.sign_label = ""
+        # Preview frames are converted into pooled buffers instead of a
+        # fresh array per frame; see release_frame
+        self.frame_pool = FramePool()
         
     def initialize(self) -> bool:
         try:
+            import depthai as dai
+            
             # Create pipeline
             self.pipeline = dai.Pipeline()
             
@@ -73,25 +102,49 @@ class OakCamera:
             st.error(f"Failed to initialize OAK camera: {str(e)}")
             return False
             
-    def start_recording(self):
+    def _open_segment(self):
+        """Start writing the next fixed-duration segment of the recording"""
+        import cv2
+        
+        self.segment_name = f"{self.session_name}_{self.segment_index:04d}.mp4"
+        path = self.spool.new_segment(
+            self.segment_name,
+            s3_key=video_key(self.segment_name, self.sign_label)
+        )
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        self.video_writer = cv2.VideoWriter(str(path), fourcc, self.FPS, self.FRAME_SIZE)
+        self.frames_in_segment = 0
+        self.segments.append(path)
+        self.segment_index += 1
+        
+    def _close_segment(self):
+        """Finish the current segment and hand it to the upload spool"""
+        if self.video_writer:
+            self.video_writer.release()
+            self.video_writer = None
+            self.spool.seal_segment(self.segment_name)
+            self.segment_name = None
+            
+    def start_recording(self, sign_label: str = "") -> Optional[Path]:
         if not self.recording:
+            self.sign_label = sign_label
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            temp_file = self.temp_dir / f"recording_{timestamp}.mp4"
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            self.video_writer = cv2.VideoWriter(str(temp_file), fourcc, 30.0, (640, 480))
+            self.session_name = f"recording_{timestamp}"
+            self.segment_index = 0
+            self.segments = []
+            self._open_segment()
             self.recording = True
-            return temp_file
+            return self.segments[0]
             
-    def stop_recording(self) -> Optional[Path]:
+    def stop_recording(self) -> List[Path]:
+        """Stop recording and return the segments queued for upload"""
         if self.recording:
             self.recording = False
-            if self.video_writer:
-                self.video_writer.release()
-                self.video_writer = None
-                return self.temp_dir.glob("recording_*.mp4").__next__()
-        return None
+            self._close_segment()
+            return self.segments
+        return []
         
-    def get_frame(self) -> Optional[np.ndarray]:
+    def get_frame(self) -> Optional["np.ndarray"]:
         if not self.device:
             return None
             
@@ -99,17 +152,40 @@ class OakCamera:
         in_rgb = q_rgb.tryGet()
         
         if in_rgb is not None:
-            frame = in_rgb.getCvFrame()
+            import cv2
+            
+            # The preview is planar RGB; interleave it to BGR directly into
+            # a pooled buffer (getCvFrame allocates a new array per frame)
+            height, width = in_rgb.getHeight(), in_rgb.getWidth()
+            planes = in_rgb.getData().reshape(3, height, width)
+            frame = self.frame_pool.acquire((height, width, 3))
+            cv2.merge((planes[2], planes[1], planes[0]), dst=frame)
             if self.recording and self.video_writer:
+                if self.frames_in_segment >= self.segment_frames:
+                    self._close_segment()
+                    self._open_segment()
                 self.video_writer.write(frame)
+                self.frames_in_segment += 1
             return frame
         return None
         
+    def release_frame(self, frame: "np.ndarray"):
+        """Return a frame from get_frame to the frame pool once it is displayed"""
+        self.frame_pool.release(frame)
+        
     def cleanup(self):
         if self.device:
             self.device.close()
-        if self.video_writer:
-            self.video_writer.release()
+        self._close_segment()
+
+@st.cache_resource
+def get_upload_spool() -> RecordingSpool:
+    """Return the process-wide spool, with its background uploader running"""
+    spool = RecordingSpool(SPOOL_DIR, max_bytes=SPOOL_MAX_BYTES)
+    s3 = get_aws_config().get_s3_client()
+    uploader = SpoolUploader(spool, s3, S3_BUCKET_NAME, num_workers=UPLOAD_WORKERS)
+    uploader.start()
+    return spool
 
 # Main app code
 def main():
@@ -118,12 +194,15 @@ def main():
         page_icon="📹",
         layout="wide"
     )
+    configure_server()
+    s3 = get_aws_config().get_s3_client()
 
     st.title("OAK Camera Video Upload to AWS")
 
     # Initialize session state
+    spool = get_upload_spool()
     if 'camera' not in st.session_state:
-        st.session_state.camera = OakCamera()
+        st.session_state.camera = OakCamera(spool)
     if 'recording' not in st.session_state:
         st.session_state.recording = False
 
@@ -138,42 +217,48 @@ def main():
         
         # Camera feed placeholder
         camera_placeholder = st.empty()
+        frame_pool_placeholder = st.empty()
         
         # Recording controls
         if not st.session_state.recording:
+            record_label = st.text_input(
+                "Sign label",
+                key="record_label",
+                help="The sign performed in the recording; unlabelled videos are left out of training"
+            )
             if st.button("Start Recording"):
-                temp_file = st.session_state.camera.start_recording()
+                temp_file = st.session_state.camera.start_recording(record_label)
                 st.session_state.recording = True
                 st.success("Recording started!")
         else:
             if st.button("Stop Recording"):
-                recorded_file = st.session_state.camera.stop_recording()
+                recorded_segments = st.session_state.camera.stop_recording()
                 st.session_state.recording = False
-                if recorded_file:
-                    st.success(f"Recording saved to {recorded_file}")
-                    
-                    # Upload to S3
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    s3_key = f"oak_videos/{timestamp}_{recorded_file.name}"
-                    
-                    try:
-                        s3.upload_file(str(recorded_file), S3_BUCKET_NAME, s3_key)
-                        st.success(f"Successfully uploaded to S3!")
-                        
-                        # Clean up temporary file
-                        recorded_file.unlink()
-                        
-                        # Display S3 URL
-                        s3_url = f"s3://{S3_BUCKET_NAME}/{s3_key}"
-                        st.code(s3_url, language="text")
-                        
-                    except Exception as e:
-                        st.error(f"Error uploading file: {str(e)}")
-                        if recorded_file.exists():
-                            recorded_file.unlink()
+                if recorded_segments:
+                    st.success(
+                        f"Recording saved as {len(recorded_segments)} segment(s) "
+                        f"and queued for upload to S3"
+                    )
+                    for segment in recorded_segments:
+                        s3_key = video_key(segment.name, st.session_state.camera.sign_label)
+                        st.code(f"s3://{S3_BUCKET_NAME}/{s3_key}", language="text")
+
+        # Upload spool status
+        spool_stats = spool.stats()
+        st.caption(
+            f"Upload queue: {spool_stats['pending'] + spool_stats['uploading']} pending, "
+            f"{spool_stats['uploaded']} uploaded, {spool_stats['failed']} failed "
+            f"({spool_stats['bytes'] / (1024 * 1024):.1f} MB on disk)"
+        )
 
     with col2:
         st.header("Upload Video")
+        # Set before choosing the file: the upload starts as soon as one is chosen
+        upload_label = st.text_input(
+            "Sign label",
+            key="upload_label",
+            help="The sign performed in the video; unlabelled videos are left out of training"
+        )
         uploaded_file = st.file_uploader("Choose a video file", type=["mp4", "avi", "mov"])
         
         if uploaded_file is not None:
@@ -188,7 +273,7 @@ def main():
             
             # Generate a unique S3 key with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            s3_key = f"oak_videos/{timestamp}_{uploaded_file.name}"
+            s3_key = video_key(f"{timestamp}_{uploaded_file.name}", upload_label)
             
             # Upload to S3
             try:
@@ -229,10 +314,29 @@ def main():
                     st.write(f"   Size: {size_mb:.2f} MB")
                     st.write(f"   Uploaded: {last_modified}")
                     
+                    # Prefer the small poster and preview segment written by
+                    # the transcode pipeline over streaming the whole file
+                    preview_key = obj['Key']
+                    processed = output_prefix(obj['Key'])
+                    try:
+                        s3.head_object(Bucket=S3_BUCKET_NAME, Key=f"{processed}preview_000.mp4")
+                    except s3.exceptions.ClientError as e:
+                        # Not transcoded (yet); anything else is a real error
+                        if e.response['Error']['Code'] not in ('404', 'NoSuchKey', 'NotFound'):
+                            raise
+                    else:
+                        preview_key = f"{processed}preview_000.mp4"
+                        poster_url = s3.generate_presigned_url(
+                            'get_object',
+                            Params={'Bucket': S3_BUCKET_NAME, 'Key': f"{processed}poster.jpg"},
+                            ExpiresIn=3600
+                        )
+                        st.image(poster_url, use_column_width=True)
+                    
                     # Generate presigned URL for video preview
                     url = s3.generate_presigned_url(
                         'get_object',
-                        Params={'Bucket': S3_BUCKET_NAME, 'Key': obj['Key']},
+                        Params={'Bucket': S3_BUCKET_NAME, 'Key': preview_key},
                         ExpiresIn=3600
                     )
                     st.video(url)
@@ -251,15 +355,29 @@ def main():
         1. Record videos directly from your OAK camera
         2. Upload existing video files
         3. View and preview your uploaded videos in AWS S3
-        All videos are stored in the `oak_videos/` directory of the S3 bucket.
+        All videos are stored in the `oak_videos/` directory of the S3 bucket,
+        in a `oak_videos/<sign>/` subdirectory when a sign label is given.
         """)
 
     # Main loop for camera feed
     if st.session_state.camera.device:
+        frames_shown = 0
         while True:
             frame = st.session_state.camera.get_frame()
             if frame is not None:
-                camera_placeholder.image(frame, channels="BGR", use_column_width=True)
+                # A button click interrupts this loop with Streamlit's rerun
+                # exception; the frame must still go back to the pool
+                try:
+                    camera_placeholder.image(frame, channels="BGR", use_column_width=True)
+                    frames_shown += 1
+                    if frames_shown % 100 == 1:
+                        pool_stats = st.session_state.camera.frame_pool.stats()
+                        frame_pool_placeholder.caption(
+                            f"Frame buffers: {pool_stats['total_bytes'] / (1024 * 1024):.1f} MB, "
+                            f"{pool_stats['total_allocations']} allocations"
+                        )
+                finally:
+                    st.session_state.camera.release_frame(frame)
             time.sleep(0.01)  # Small delay to prevent high CPU usage
 
 if __name__ == "__main__":
@@ -2,6 +2,9 @@ import cv2
 import numpy as np
 import mediapipe as mp
 
+from utils.frame_pool import FramePool
+from utils.overlay import LandmarkOverlay
+
 class CameraHandler:
     def __init__(self):
         self.cap = None
@@ -11,7 +14,11 @@ class CameraHandler:
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        self.mp_drawing = mp.solutions.drawing_utils
+        self.overlay = LandmarkOverlay()
+        self.pool = FramePool()
+        self.frame_shape = None
+        self.display_buffer = None
+        self.last_results = None
         
     def start_camera(self):
         """Start the camera capture"""
@@ -27,31 +34,103 @@ class CameraHandler:
             self.cap.release()
             self.cap = None
     
-    def get_frame(self):
-        """Get a frame from the camera with hand landmarks"""
+    def read_frame(self):
+        """
+        Get a clean frame from the camera and detect hands in it
+        
+        Nothing is drawn on the returned frame, so it can be recorded or
+        used for recognition as-is. The frame is checked out from the
+        frame pool; hand it back with release_frame when done with it.
+        
+        Returns:
+            tuple: (BGR frame, MediaPipe results), or (None, None)
+        """
         if self.cap is None:
-            return None
+            return None, None
+        
+        frame = self._capture()
+        if frame is None:
+            return None, None
         
-        ret, frame = self.cap.read()
+        # Convert the BGR image to RGB into a pooled buffer
+        rgb_frame = self.pool.cvt_color(frame, cv2.COLOR_BGR2RGB)
+        try:
+            # Process the frame and detect hands
+            results = self.hands.process(rgb_frame)
+        finally:
+            self.pool.release(rgb_frame)
+        self.last_results = results
+        
+        return frame, results
+    
+    def _capture(self):
+        """Read the next camera frame into a pooled buffer"""
+        if self.frame_shape is None:
+            # The first read learns the camera's frame format
+            ret, frame = self.cap.read()
+            if not ret:
+                return None
+            self.frame_shape = frame.shape
+            buffer = self.pool.acquire(frame.shape, frame.dtype)
+            np.copyto(buffer, frame)
+            return buffer
+        
+        buffer = self.pool.acquire(self.frame_shape)
+        ret, frame = self.cap.read(buffer)
         if not ret:
+            self.pool.release(buffer)
             return None
+        if frame is not buffer:
+            # The camera switched resolution and OpenCV allocated a new array
+            self.pool.release(buffer)
+            buffer = self.pool.acquire(frame.shape, frame.dtype)
+            np.copyto(buffer, frame)
+            self.frame_shape = frame.shape
+        return buffer
+    
+    def release_frame(self, frame):
+        """Return a frame from read_frame to the frame pool"""
+        self.pool.release(frame)
+    
+    def memory_stats(self):
+        """Frame pool statistics, see FramePool.stats"""
+        return self.pool.stats()
+    
+    def render_display(self, frame, results=None):
+        """
+        Draw hand landmarks into the display buffer
         
-        # Convert the BGR image to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        Only call this for frames that are actually shown. The buffer is
+        reused on every call, so copy the result if it must outlive the
+        next call.
         
-        # Process the frame and detect hands
-        results = self.hands.process(rgb_frame)
+        Args:
+            frame: Clean frame from read_frame
+            results: MediaPipe results for the frame (defaults to the last)
         
-        # Draw hand landmarks on the frame
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    mp.solutions.hands.HAND_CONNECTIONS
-                )
+        Returns:
+            np.ndarray: The display buffer with the overlay
+        """
+        if results is None:
+            results = self.last_results
+        if self.display_buffer is None or self.display_buffer.shape != frame.shape:
+            if self.display_buffer is not None:
+                self.pool.release(self.display_buffer)
+            self.display_buffer = self.pool.acquire(frame.shape, frame.dtype)
+        landmarks = results.multi_hand_landmarks if results is not None else None
+        return self.overlay.render(frame, landmarks, dst=self.display_buffer)
+    
+    def get_frame(self):
+        """Get a frame from the camera with hand landmarks"""
+        frame, results = self.read_frame()
+        if frame is None:
+            return None
         
-        return frame
+        # Draw hand landmarks on a display copy of the frame
+        try:
+            return self.render_display(frame, results)
+        finally:
+            self.release_frame(frame)
     
     def __del__(self):
         """Cleanup when the object is destroyed"""
@@ -0,0 +1,156 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+FormatKey = Tuple[Tuple[int, ...], str]
+
+
+class FramePool:
+    """
+    Pool of preallocated frame buffers, one free list per shape and dtype
+
+    Buffers are checked out with ``acquire`` and handed back with
+    ``release``; whoever holds a buffer owns it until it is released.
+    After the first few frames the capture loop reuses buffers and
+    allocates nothing, which ``stats()`` makes visible: ``allocations``
+    stops growing while ``acquires`` keeps counting.
+    """
+
+    def __init__(self, buffers_per_format: int = 4, allow_growth: bool = True):
+        """
+        Args:
+            buffers_per_format: Buffers preallocated the first time a
+                shape/dtype is requested
+            allow_growth: Allocate an extra buffer when a format's pool is
+                exhausted instead of raising RuntimeError
+        """
+        self.buffers_per_format = buffers_per_format
+        self.allow_growth = allow_growth
+        self._lock = threading.Lock()
+        self._free: Dict[FormatKey, list] = {}
+        self._owned: Dict[int, FormatKey] = {}
+        self._checked_out = set()
+        self._stats: Dict[FormatKey, dict] = {}
+
+    @staticmethod
+    def _key(shape, dtype) -> FormatKey:
+        return tuple(int(dim) for dim in shape), np.dtype(dtype).str
+
+    def _allocate(self, key: FormatKey) -> np.ndarray:
+        buffer = np.empty(key[0], dtype=np.dtype(key[1]))
+        self._owned[id(buffer)] = key
+        self._stats[key]["allocations"] += 1
+        self._stats[key]["capacity"] += 1
+        return buffer
+
+    def reserve(self, shape, dtype=np.uint8, count: int = None):
+        """Preallocate buffers for a format ahead of the capture loop"""
+        key = self._key(shape, dtype)
+        with self._lock:
+            self._ensure_format(key, count)
+
+    def _ensure_format(self, key: FormatKey, count: int = None):
+        if key in self._free:
+            return
+        self._free[key] = []
+        self._stats[key] = {"capacity": 0, "in_use": 0, "peak_in_use": 0, "allocations": 0, "acquires": 0}
+        for _ in range(count or self.buffers_per_format):
+            self._free[key].append(self._allocate(key))
+
+    def acquire(self, shape, dtype=np.uint8) -> np.ndarray:
+        """
+        Check out a buffer of the given shape and dtype
+
+        The contents are whatever the previous owner left behind.
+
+        Raises:
+            RuntimeError: If the format is exhausted and growth is disabled
+        """
+        key = self._key(shape, dtype)
+        with self._lock:
+            self._ensure_format(key)
+            stats = self._stats[key]
+            if self._free[key]:
+                buffer = self._free[key].pop()
+            elif self.allow_growth:
+                buffer = self._allocate(key)
+            else:
+                raise RuntimeError(f"Frame pool exhausted for shape {key[0]} dtype {key[1]}")
+            self._checked_out.add(id(buffer))
+            stats["acquires"] += 1
+            stats["in_use"] += 1
+            stats["peak_in_use"] = max(stats["peak_in_use"], stats["in_use"])
+        return buffer
+
+    def release(self, buffer: np.ndarray):
+        """
+        Return a checked-out buffer to the pool
+
+        Raises:
+            ValueError: If the buffer does not belong to this pool or was
+                already released
+        """
+        with self._lock:
+            if id(buffer) not in self._checked_out:
+                raise ValueError("Buffer is not checked out from this pool")
+            self._checked_out.remove(id(buffer))
+            key = self._owned[id(buffer)]
+            self._free[key].append(buffer)
+            self._stats[key]["in_use"] -= 1
+
+    def owns(self, buffer: np.ndarray) -> bool:
+        return id(buffer) in self._checked_out
+
+    @contextmanager
+    def frame(self, shape, dtype=np.uint8):
+        """Check out a buffer for the duration of a ``with`` block"""
+        buffer = self.acquire(shape, dtype)
+        try:
+            yield buffer
+        finally:
+            self.release(buffer)
+
+    # cv2 is imported in the helpers below so that importing the pool does
+    # not load OpenCV into the Streamlit entry points
+
+    def cvt_color(self, src: np.ndarray, code: int, channels: int = 3) -> np.ndarray:
+        """``cv2.cvtColor`` into a pooled buffer; the caller must release it"""
+        import cv2
+
+        dst = self.acquire(src.shape[:2] + (channels,), src.dtype)
+        return cv2.cvtColor(src, code, dst=dst)
+
+    def resize(self, src: np.ndarray, size: Tuple[int, int], interpolation: Optional[int] = None) -> np.ndarray:
+        """``cv2.resize`` to (width, height) into a pooled buffer; the caller must release it"""
+        import cv2
+
+        width, height = size
+        dst = self.acquire((height, width) + src.shape[2:], src.dtype)
+        if interpolation is None:
+            interpolation = cv2.INTER_LINEAR
+        return cv2.resize(src, size, dst=dst, interpolation=interpolation)
+
+    def stats(self) -> dict:
+        """
+        Memory statistics per format and in total
+
+        Returns:
+            dict: ``formats`` maps "HxWxC dtype" to capacity, in_use,
+            peak_in_use, allocations and acquires; ``total_bytes`` and
+            ``total_allocations`` sum over all formats
+        """
+        with self._lock:
+            formats = {}
+            total_bytes = 0
+            for key, stats in self._stats.items():
+                shape, dtype = key
+                nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                total_bytes += nbytes * stats["capacity"]
+                formats[f"{'x'.join(map(str, shape))} {np.dtype(dtype).name}"] = dict(stats, bytes=nbytes * stats["capacity"])
+            return {
+                "formats": formats,
+                "total_bytes": total_bytes,
+                "total_allocations": sum(stats["allocations"] for stats in self._stats.values())
+            }
@@ -0,0 +1,94 @@
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Entry points and the heavy modules that must not load when they are imported
+ENTRY_POINTS = {
+    "src.ui.oak_upload_app": ("depthai", "cv2", "boto3", "botocore"),
+    "application": ("depthai", "cv2", "boto3", "botocore"),
+    "aws.config": ("boto3", "botocore"),
+}
+
+
+def import_profile(module: str, cwd: Path = ROOT) -> Dict[str, int]:
+    """
+    Import ``module`` in a fresh interpreter under ``python -X importtime``
+
+    Args:
+        module: Dotted module name to import
+        cwd: Working directory; it and ``cwd/src`` are put on the path
+
+    Returns:
+        dict: Cumulative import time in microseconds for every module
+        loaded, keyed by module name
+
+    Raises:
+        RuntimeError: If the import itself fails
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(cwd), str(cwd / "src"), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def check_entry_point(
+    module: str,
+    forbidden: Iterable[str],
+    budget_ms: Optional[float] = None
+) -> List[str]:
+    """
+    Check that importing an entry point stays cheap
+
+    Args:
+        module: Entry point module
+        forbidden: Modules that must not be loaded at import time
+        budget_ms: Optional limit on the cumulative import time of ``module``
+
+    Returns:
+        list: Human-readable problems; empty when the entry point passes
+    """
+    timings = import_profile(module)
+    problems = [
+        f"{module} imports {name} at import time ({timings[name] / 1000:.0f} ms)"
+        for name in forbidden
+        if name in timings
+    ]
+    total_ms = timings.get(module, 0) / 1000
+    if budget_ms is not None and total_ms > budget_ms:
+        problems.append(f"{module} takes {total_ms:.0f} ms to import (budget {budget_ms:.0f} ms)")
+    print(f"{module}: {total_ms:.0f} ms")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check import-time cost of the app entry points")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail above this import time")
+    args = parser.parse_args()
+
+    problems = []
+    for module, forbidden in ENTRY_POINTS.items():
+        problems.extend(check_entry_point(module, forbidden, args.budget_ms))
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
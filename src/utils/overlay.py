@@ -0,0 +1,109 @@
+import cv2
+import numpy as np
+from typing import Optional, Sequence
+
+# MediaPipe HAND_CONNECTIONS as an index array, so all segments of all
+# hands can be gathered with one fancy-indexing operation
+HAND_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (17, 18), (18, 19), (19, 20),
+    (0, 17)
+], dtype=np.intp)
+
+NUM_LANDMARKS = 21
+
+
+def landmarks_to_pixels(multi_hand_landmarks: Sequence, width: int, height: int) -> np.ndarray:
+    """
+    Convert MediaPipe hand landmarks to pixel coordinates
+
+    Args:
+        multi_hand_landmarks: ``results.multi_hand_landmarks`` from MediaPipe
+        width: Frame width in pixels
+        height: Frame height in pixels
+
+    Returns:
+        np.ndarray: int32 array of shape (hands, 21, 2)
+    """
+    coords = np.array(
+        [[(point.x, point.y) for point in hand.landmark] for hand in multi_hand_landmarks],
+        dtype=np.float32
+    ).reshape(-1, NUM_LANDMARKS, 2)
+    coords *= (width, height)
+    return coords.round().astype(np.int32)
+
+
+class LandmarkOverlay:
+    """
+    Draw hand skeletons with two batched OpenCV calls
+
+    All connections of all hands go through a single ``cv2.polylines`` call.
+    All landmarks go through a second one, as zero-length segments whose
+    round caps render as filled dots. This replaces a ``cv2.line`` and
+    ``cv2.circle`` call per connection and point in
+    ``mp_drawing.draw_landmarks``. The colours match its defaults.
+    """
+
+    def __init__(
+        self,
+        connection_color=(224, 224, 224),
+        landmark_color=(0, 0, 255),
+        connection_thickness: int = 2,
+        landmark_radius: int = 3
+    ):
+        self.connection_color = connection_color
+        self.landmark_color = landmark_color
+        self.connection_thickness = connection_thickness
+        self.landmark_radius = landmark_radius
+
+    def draw(self, image: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """
+        Draw hands in place
+
+        Args:
+            image: BGR image to draw on
+            points: int32 pixel coordinates of shape (hands, 21, 2)
+
+        Returns:
+            np.ndarray: ``image``
+        """
+        if points.size == 0:
+            return image
+        segments = points[:, HAND_CONNECTIONS].reshape(-1, 2, 2)
+        cv2.polylines(image, segments, False, self.connection_color, self.connection_thickness, cv2.LINE_8)
+        dots = np.repeat(points.reshape(-1, 1, 2), 2, axis=1)
+        cv2.polylines(image, dots, False, self.landmark_color, 2 * self.landmark_radius, cv2.LINE_8)
+        return image
+
+    def render(
+        self,
+        frame: np.ndarray,
+        multi_hand_landmarks: Optional[Sequence],
+        dst: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Render a display copy of ``frame`` with the hands drawn on it
+
+        ``frame`` itself is never modified, so it can still be recorded or
+        fed to recognition.
+
+        Args:
+            frame: Clean BGR camera frame
+            multi_hand_landmarks: ``results.multi_hand_landmarks`` (may be None)
+            dst: Preallocated display buffer of the same shape and dtype;
+                a new array is allocated when omitted
+
+        Returns:
+            np.ndarray: The display image (``dst`` when given)
+        """
+        if dst is None:
+            dst = frame.copy()
+        else:
+            np.copyto(dst, frame)
+        if multi_hand_landmarks:
+            height, width = frame.shape[:2]
+            self.draw(dst, landmarks_to_pixels(multi_hand_landmarks, width, height))
+        return dst
@@ -0,0 +1,348 @@
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Segment lifecycle states stored in the spool index
+RECORDING = "recording"
+PENDING = "pending"
+UPLOADING = "uploading"
+UPLOADED = "uploaded"
+FAILED = "failed"
+
+
+class RecordingSpool:
+    """
+    Durable on-disk spool of recording segments.
+
+    Every segment is tracked in ``index.json`` inside the spool directory so
+    that pending uploads survive app restarts and network outages. The index
+    is rewritten atomically on every state change.
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(
+        self,
+        spool_dir: str = "temp_recordings",
+        max_bytes: int = 2 * 1024 ** 3,
+        max_attempts: int = 0
+    ):
+        """
+        Args:
+            spool_dir: Directory holding segment files and the index
+            max_bytes: Disk quota for all segments in the spool
+            max_attempts: Give up on a segment after this many failed
+                uploads (0 retries forever)
+        """
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.spool_dir / self.INDEX_NAME
+        self.max_bytes = max_bytes
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._segments: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self):
+        """Load the index and recover segments left behind by a crash"""
+        if self.index_path.exists():
+            with open(self.index_path, "r") as f:
+                self._segments = json.load(f).get("segments", {})
+
+        for name, segment in list(self._segments.items()):
+            if not Path(segment["path"]).exists():
+                if segment["status"] != UPLOADED:
+                    print(f"Spool segment missing on disk, dropping: {name}")
+                del self._segments[name]
+                continue
+            # A segment that was still being written when the process died
+            # is unplayable: the mp4 index is only written when the
+            # VideoWriter is released. Keep it out of the upload queue; it is
+            # left on disk until the quota evicts it.
+            if segment["status"] == RECORDING:
+                segment["status"] = FAILED
+                segment["size"] = Path(segment["path"]).stat().st_size
+                segment["last_error"] = "Incomplete: recording was interrupted"
+                print(f"Spool segment was interrupted while recording, not uploading: {name}")
+            # A sealed segment whose upload was cut short is retried
+            elif segment["status"] == UPLOADING:
+                segment["status"] = PENDING
+                segment["next_attempt_at"] = 0
+        self._save()
+
+    def _save(self):
+        """Atomically write the index to disk (caller holds the lock)"""
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"segments": self._segments}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    def new_segment(self, name: str, s3_key: str) -> Path:
+        """
+        Register a new segment that is about to be written
+
+        Args:
+            name: File name of the segment inside the spool directory
+            s3_key: Destination key of the segment in S3
+
+        Returns:
+            Path: Path the caller should write the segment to
+        """
+        path = self.spool_dir / name
+        with self._lock:
+            self._segments[name] = {
+                "path": str(path),
+                "s3_key": s3_key,
+                "status": RECORDING,
+                "size": 0,
+                "attempts": 0,
+                "next_attempt_at": 0,
+                "created_at": datetime.now().isoformat(),
+                "uploaded_at": None,
+                "last_error": None
+            }
+            self._save()
+        return path
+
+    def seal_segment(self, name: str):
+        """Mark a finished segment as ready for upload"""
+        with self._lock:
+            segment = self._segments.get(name)
+            if segment is None:
+                return
+            segment["status"] = PENDING
+            segment["size"] = Path(segment["path"]).stat().st_size
+            self._save()
+            self._available.notify_all()
+        self.enforce_quota()
+
+    def claim_next(self, timeout: float = 1.0) -> Optional[dict]:
+        """
+        Claim the oldest segment that is due for upload
+
+        Args:
+            timeout: Seconds to wait for a segment to become due
+
+        Returns:
+            dict: Copy of the claimed segment entry (with its ``name``),
+            or None if nothing became due within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                now = time.time()
+                due = [
+                    (segment["created_at"], name)
+                    for name, segment in self._segments.items()
+                    if segment["status"] == PENDING
+                    and segment["next_attempt_at"] <= now
+                ]
+                if due:
+                    _, name = min(due)
+                    segment = self._segments[name]
+                    segment["status"] = UPLOADING
+                    self._save()
+                    return dict(segment, name=name)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._available.wait(remaining)
+
+    def mark_uploaded(self, name: str):
+        """Record a successful upload; the file is kept until evicted"""
+        with self._lock:
+            segment = self._segments.get(name)
+            if segment is None:
+                return
+            segment["status"] = UPLOADED
+            segment["uploaded_at"] = datetime.now().isoformat()
+            segment["last_error"] = None
+            self._save()
+
+    def mark_failed(self, name: str, error: str, retry_delay: float) -> bool:
+        """
+        Record a failed upload and schedule the next attempt
+
+        Args:
+            name: Segment name
+            error: Error message of the failed attempt
+            retry_delay: Seconds to wait before the segment is due again
+
+        Returns:
+            bool: True if the segment will be retried, False if it reached
+            max_attempts and is now failed for good
+        """
+        with self._lock:
+            segment = self._segments.get(name)
+            if segment is None:
+                return False
+            segment["attempts"] += 1
+            segment["last_error"] = error
+            retry = not (self.max_attempts and segment["attempts"] >= self.max_attempts)
+            if retry:
+                segment["status"] = PENDING
+                segment["next_attempt_at"] = time.time() + retry_delay
+            else:
+                segment["status"] = FAILED
+            self._save()
+            return retry
+
+    def enforce_quota(self) -> List[str]:
+        """
+        Delete segments until the spool fits in its disk quota
+
+        Already-uploaded segments are evicted first, oldest first. Segments
+        that still have to be uploaded are only evicted as a last resort.
+
+        Returns:
+            list: Names of the evicted segments
+        """
+        evicted = []
+        with self._lock:
+            total = sum(segment["size"] for segment in self._segments.values())
+            if total <= self.max_bytes:
+                return evicted
+
+            def eviction_order(item):
+                name, segment = item
+                return (segment["status"] != UPLOADED, segment["created_at"])
+
+            candidates = sorted(
+                (
+                    item for item in self._segments.items()
+                    if item[1]["status"] not in (RECORDING, UPLOADING)
+                ),
+                key=eviction_order
+            )
+            for name, segment in candidates:
+                if total <= self.max_bytes:
+                    break
+                if segment["status"] != UPLOADED:
+                    print(f"Spool over quota, dropping un-uploaded segment: {name}")
+                Path(segment["path"]).unlink(missing_ok=True)
+                total -= segment["size"]
+                del self._segments[name]
+                evicted.append(name)
+            self._save()
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        """Count segments per status and the bytes they occupy"""
+        with self._lock:
+            counts = {status: 0 for status in (RECORDING, PENDING, UPLOADING, UPLOADED, FAILED)}
+            for segment in self._segments.values():
+                counts[segment["status"]] += 1
+            counts["bytes"] = sum(segment["size"] for segment in self._segments.values())
+        return counts
+
+
+class SpoolUploader:
+    """
+    Background thread pool that drains a RecordingSpool to S3.
+
+    Failed uploads are retried with exponential backoff and jitter, so
+    capture never waits on the network.
+    """
+
+    def __init__(
+        self,
+        spool: RecordingSpool,
+        s3_client,
+        bucket_name: str,
+        num_workers: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+        on_uploaded: Optional[Callable[[dict], None]] = None
+    ):
+        """
+        Args:
+            spool: Spool to drain
+            s3_client: boto3 S3 client (thread-safe)
+            bucket_name: Destination bucket
+            num_workers: Number of concurrent segment uploads
+            base_delay: Backoff after the first failed attempt, in seconds
+            max_delay: Upper bound on the backoff, in seconds
+            on_uploaded: Optional callback invoked with each uploaded segment
+        """
+        self.spool = spool
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.num_workers = num_workers
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_uploaded = on_uploaded
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Start the worker threads (no-op if already running)"""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._worker,
+                name=f"spool-uploader-{i}",
+                daemon=True
+            )
+            for i in range(self.num_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Signal the workers to stop and wait for in-flight uploads"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def backoff(self, attempts: int) -> float:
+        """Delay before retry number ``attempts + 1`` (full jitter)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempts))
+        return random.uniform(delay / 2, delay)
+
+    def _worker(self):
+        while not self._stop.is_set():
+            # Any error (e.g. the index cannot be saved on a full disk) is
+            # logged and the worker keeps going instead of dying silently
+            try:
+                self._upload_next()
+            except Exception as e:
+                print(f"Spool uploader error: {str(e)}")
+                self._stop.wait(1.0)
+
+    def _upload_next(self):
+        """Claim and upload one due segment, if any"""
+        segment = self.spool.claim_next(timeout=1.0)
+        if segment is None:
+            return
+        try:
+            self.s3_client.upload_file(
+                segment["path"],
+                self.bucket_name,
+                segment["s3_key"]
+            )
+        except Exception as e:
+            delay = self.backoff(segment["attempts"])
+            if self.spool.mark_failed(segment["name"], str(e), delay):
+                print(f"Upload of {segment['name']} failed, retrying in {delay:.1f}s: {str(e)}")
+            else:
+                print(f"Upload of {segment['name']} failed permanently after {segment['attempts'] + 1} attempts: {str(e)}")
+            return
+
+        self.spool.mark_uploaded(segment["name"])
+        if self.on_uploaded:
+            self.on_uploaded(segment)
@@ -0,0 +1,225 @@
+import json
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import torch
+from torch.profiler import ProfilerActivity, profile, record_function, schedule
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("data_wait", "h2d", "augment", "forward", "backward", "optimizer")
+
+
+class TrainingProfiler:
+    """
+    Opt-in per-step timing of the training loop
+
+    Each step is split into phases: waiting for the DataLoader, the
+    host-to-device copy, augmentation, forward, backward and the optimizer
+    step. On CUDA the device is synchronized at every phase boundary so
+    the time lands in the phase that queued the work; this slows training
+    down a little, which is why profiling is opt-in.
+
+    Every run writes to its own directory:
+
+    - ``steps.jsonl``: one line of phase timings per step
+    - ``summary.json``: per-stage totals, samples/sec and phase breakdown
+    - ``trace.json``: Chrome trace of a window of training steps, when
+      ``trace=True`` (open in chrome://tracing or Perfetto)
+
+    Usage::
+
+        profiler = TrainingProfiler("profiles", trace=True)
+        train(data_path, profiler=profiler)
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        trace: bool = False,
+        trace_wait: int = 10,
+        trace_warmup: int = 2,
+        trace_active: int = 5,
+        enabled: bool = True
+    ):
+        """
+        Args:
+            output_dir: Directory that receives one subdirectory per run
+            trace: Capture a torch.profiler trace
+            trace_wait: Training steps to skip before tracing (lets the
+                DataLoader workers and caches warm up)
+            trace_warmup: Steps traced but discarded, as torch.profiler
+                recommends
+            trace_active: Steps recorded in the trace
+            enabled: When False every method is a no-op
+        """
+        self.output_dir = Path(output_dir)
+        self.trace = trace
+        self.trace_schedule = schedule(wait=trace_wait, warmup=trace_warmup, active=trace_active, repeat=1)
+        self.enabled = enabled
+        self.run_dir: Optional[Path] = None
+        self.epoch = 0
+        self._sync = False
+        self._torch_profiler = None
+        self._steps_file = None
+        self._records: List[Dict] = []
+        self._current: Dict[str, float] = {}
+        self._stage_seconds: Dict[str, float] = {}
+
+    @classmethod
+    def disabled(cls) -> "TrainingProfiler":
+        return cls(enabled=False)
+
+    def start(self, device: torch.device):
+        """Open the run directory and start the trace, if requested"""
+        if not self.enabled:
+            return
+        device = torch.device(device)
+        self._sync = device.type == "cuda"
+        self.run_dir = self.output_dir / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self._steps_file = open(self.run_dir / "steps.jsonl", "w")
+        self._records = []
+        self._stage_seconds = {}
+
+        if self.trace:
+            activities = [ProfilerActivity.CPU]
+            if self._sync:
+                activities.append(ProfilerActivity.CUDA)
+            trace_path = str(self.run_dir / "trace.json")
+            self._torch_profiler = profile(
+                activities=activities,
+                schedule=self.trace_schedule,
+                on_trace_ready=lambda prof: prof.export_chrome_trace(trace_path),
+                record_shapes=True
+            )
+            self._torch_profiler.start()
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def _synchronize(self):
+        if self._sync:
+            torch.cuda.synchronize()
+
+    def iterate(self, dataloader: Iterable, stage: str = "train") -> Iterator:
+        """
+        Iterate over a DataLoader, timing the wait for each batch
+
+        Each batch starts a new step; the step is recorded by ``end_step``.
+        """
+        if not self.enabled:
+            yield from dataloader
+            return
+        iterator = iter(dataloader)
+        stage_start = time.perf_counter()
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    return
+                self._current = {"data_wait": time.perf_counter() - start}
+                yield batch
+        finally:
+            self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + time.perf_counter() - stage_start
+
+    def phase(self, name: str):
+        """Context manager timing one phase of the current step"""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed_phase(name)
+
+    @contextmanager
+    def _timed_phase(self, name: str):
+        self._synchronize()
+        start = time.perf_counter()
+        with record_function(name):
+            yield
+        self._synchronize()
+        self._current[name] = self._current.get(name, 0.0) + time.perf_counter() - start
+
+    def end_step(self, batch_size: int, stage: str = "train"):
+        """Record the current step and advance the trace schedule"""
+        if not self.enabled:
+            return
+        record = {"stage": stage, "epoch": self.epoch, "batch_size": batch_size}
+        record.update({name: round(seconds, 6) for name, seconds in self._current.items()})
+        self._records.append(record)
+        self._steps_file.write(json.dumps(record) + "\n")
+        self._current = {}
+        if stage == "train" and self._torch_profiler is not None:
+            self._torch_profiler.step()
+
+    def summary(self) -> Dict:
+        """
+        Aggregate the recorded steps per stage
+
+        Returns:
+            dict: For each stage the number of steps and samples, wall
+            time, samples/sec and, per phase, mean/p50/p95 milliseconds and
+            the share of the measured step time
+        """
+        summary = {}
+        for stage in sorted({record["stage"] for record in self._records}):
+            records = [record for record in self._records if record["stage"] == stage]
+            samples = sum(record["batch_size"] for record in records)
+            seconds = self._stage_seconds.get(stage, 0.0)
+            phase_totals = {name: sum(record.get(name, 0.0) for record in records) for name in PHASES}
+            measured = sum(phase_totals.values()) or 1e-9
+            phases = {}
+            for name in PHASES:
+                if not any(name in record for record in records):
+                    continue
+                times_ms = np.array([record.get(name, 0.0) for record in records]) * 1000
+                phases[name] = {
+                    "mean_ms": round(float(times_ms.mean()), 3),
+                    "p50_ms": round(float(np.percentile(times_ms, 50)), 3),
+                    "p95_ms": round(float(np.percentile(times_ms, 95)), 3),
+                    "share": round(phase_totals[name] / measured, 4)
+                }
+            summary[stage] = {
+                "steps": len(records),
+                "samples": samples,
+                "seconds": round(seconds, 3),
+                "samples_per_sec": round(samples / seconds, 2) if seconds else None,
+                "phases": phases
+            }
+        return summary
+
+    def stop(self) -> Optional[Dict]:
+        """
+        Finish the run: flush the trace and write and log the summary
+
+        Returns:
+            dict: The summary, or None when disabled
+        """
+        if not self.enabled or self.run_dir is None:
+            return None
+        if self._torch_profiler is not None:
+            # Exports the trace if the active window was reached
+            self._torch_profiler.stop()
+            self._torch_profiler = None
+        self._steps_file.close()
+
+        summary = self.summary()
+        with open(self.run_dir / "summary.json", "w") as f:
+            json.dump(summary, f, indent=2)
+
+        for stage, stats in summary.items():
+            logger.info(
+                f"Profile {stage}: {stats['steps']} steps, {stats['samples_per_sec']} samples/sec"
+            )
+            for name, phase in stats["phases"].items():
+                logger.info(
+                    f"  {name:<10} {phase['mean_ms']:>9.2f} ms mean {phase['p95_ms']:>9.2f} ms p95 "
+                    f"{phase['share'] * 100:5.1f}%"
+                )
+        logger.info(f"Profile written to {self.run_dir}")
+        return summary